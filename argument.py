@@ -1,18 +1,56 @@
+import sys
+from .validate import Validator
+
 # This is a class that stores information about a particular argument
 class Arg:
 
+    # The attributes are stored in slots to reduce the memory of large files
+    # The owner is the file the argument belongs to, which is told when the value is changed in place
+    __slots__ = ("key", "name", "default", "flag", "values", "options", "validator", "_value", "dirty", "owner")
+
+    # The shared tuples of option values, as many arguments have the same options
+    SHARED_VALUES = {}
+
     ############################################################
 
     # Constructor for initialising the constructor
     # Takes in a key, name, a default value and a list of possible values (optional)
-    def __init__ (self, key, name, default, flag = False, values=[]):
-        self.key = str(key).lower()
+    def __init__ (self, key, name, default, flag = False, values=()):
+        self.key = sys.intern(str(key).lower())
         self.name = name
         self.default = Arg.convert(default)
         self.flag = flag != "" and flag != False
-        self.values = values
-        self.options = len(values) > 0 and values[0] != ""
-        self.value = self.default
+        self.values = Arg.share(values)
+        self.validator = Validator.compile(self.default, self.values)
+        self.options = len(self.validator.choices) > 0
+        self._value = self.default
+        self.dirty = False
+        self.owner = None
+
+
+
+    ############################################################
+
+    # Gets the current value of the argument
+    @property
+    def value (self):
+        return self._value
+
+
+
+    ############################################################
+
+    # Sets the current value of the argument
+    # The argument is marked as dirty if the value has changed, and the file that owns the
+    # argument is told so that any tables of its values are updated
+    @value.setter
+    def value (self, value):
+        if type(value) is not type(self._value) or value != self._value:
+            self._value = value
+            self.dirty = True
+            owner = getattr(self, "owner", None)
+            if owner is not None:
+                owner.changed(self)
 
 
 
@@ -24,7 +62,7 @@ class Arg:
         # Checks if there are possible values
         if self.options:
             # Makes sure the value exists
-            if value in self.values:
+            if value in self.validator.choices:
                 self.value = value
             else:
                 self.value = self.default
@@ -32,16 +70,14 @@ class Arg:
             return self.value
 
         # Determine the return based on type
+        # Values that cannot be read as the type use the default
         if value == "":
             self.value = self.default
-        elif value.lower() in ("t", "f", "true", "false"):
-            self.value = value.lower()[0] == "t"
-        elif type(self.default) is int:
-            self.value = int(value)
-        elif type(self.default) is float:
-            self.value = float(value)
         else:
-            self.value = value
+            try:
+                self.value = self.validator.coerce(value)
+            except ValueError:
+                self.value = self.default
         
         # Returns the value
         return self.value
@@ -61,7 +97,7 @@ class Arg:
     # Converts the argument to a string
     def __str__ (self):
         return "Key: %s   Name: %s   Default: %s   Flag: %s    Options: %s   Value: %s" \
-            % (self.key, self.name, self.default, self.flag, self.values, self.value)
+            % (self.key, self.name, self.default, self.flag, list(self.values), self.value)
 
 
     ############################################################
@@ -83,14 +119,56 @@ class Arg:
 
 
 
+    ############################################################
+
+    # Returns a copy of the argument, which shares the same option values
+    def copy (self):
+        arg = Arg.__new__(Arg)
+        for name in Arg.__slots__:
+            setattr(arg, name, getattr(self, name, None))
+        return arg
+
+
+
+    ############################################################
+
+    # Returns the attributes that are stored when pickling, which leave out the owner
+    # The owner is set again once the argument is read
+    def __getstate__ (self):
+        return (None, dict([(name, getattr(self, name)) for name in Arg.__slots__ if name != "owner"]))
+
+
+
+    ############################################################
+
+    # Returns the shared tuple for a list of option values
+    @staticmethod
+    def share (values) -> tuple:
+        values = tuple(values)
+        return Arg.SHARED_VALUES.setdefault(values, values)
+
+
+
+    ############################################################
+
+    # Returns the list of errors for the current value, or for another value
+    def check (self, *value) -> list:
+        return self.validator.check(value[0] if len(value) > 0 else self.value)
+
+
+
     ############################################################
 
     # Reads a value and stores it of the correct type
     @staticmethod
     def convert (value):
+        # Booleans are kept, as they would otherwise be read as numbers
+        if type(value) is bool:
+            return value
+
         # For float nad integers
         if str(value).isnumeric():
-            if "." in value:
+            if "." in str(value):
                 return float(value)
             else:
                 return int(value)
@@ -0,0 +1,120 @@
+#!/usr/bin/python3
+
+# Multi-threaded stress benchmark for reading parameters while they are being changed
+# Run from the directory containing the package:
+#   python3 -m params.benchmarks.concurrency --threads 1,2,4,8
+
+import os
+import sys
+import json
+import time
+import argparse
+import tempfile
+import threading
+from ..params import Params
+
+
+
+############################################################
+
+# Creates a parameter file with a number of integer parameters
+# Two extra parameters (pair_a and pair_b) are always changed together
+def create_file (path, count):
+    with open(path, "w") as file:
+        file.write("# Benchmark parameter file\n")
+        for i in range(0, count):
+            file.write("key_%d | Key %d | %d | |\n" % (i, i, i))
+        file.write("pair_a | Pair A | 0 | |\n")
+        file.write("pair_b | Pair B | 0 | |\n")
+
+
+
+############################################################
+
+# Runs the readers and a writer for a duration
+# Returns the number of reads per second and the number of torn reads
+def run (params, threads, duration, keys):
+    stop = threading.Event()
+    reads = [0] * threads
+    torn = [0] * threads
+
+    # Reads the values as quickly as possible
+    # Every so often the pair of values is checked from a single snapshot
+    def reader (idx):
+        count = 0
+        while not stop.is_set():
+            for _ in range(0, 100):
+                for key in keys:
+                    params.get(key)
+                count += len(keys)
+
+            snapshot = params.get_all()
+            if snapshot["pair_a"] != snapshot["pair_b"]:
+                torn[idx] += 1
+        reads[idx] = count
+
+    # Changes both values of the pair in a single update, saving every 50 updates
+    def writer ():
+        value = 0
+        while not stop.is_set():
+            value += 1
+            with params.transaction(save = value % 50 == 0) as changes:
+                changes["pair_a"] = value
+                changes["pair_b"] = value
+            time.sleep(0.001)
+
+    # Start all of the threads
+    workers = [threading.Thread(target=reader, args=(i,)) for i in range(0, threads)]
+    workers.append(threading.Thread(target=writer))
+    start = time.perf_counter()
+    for w in workers:
+        w.start()
+
+    time.sleep(duration)
+    stop.set()
+    for w in workers:
+        w.join()
+    elapsed = time.perf_counter() - start
+
+    return sum(reads) / elapsed, sum(torn)
+
+
+
+############################################################
+
+# Runs the benchmark for each number of threads
+def main ():
+    parser = argparse.ArgumentParser(description="Concurrent read benchmark for Params")
+    parser.add_argument("--keys", type=int, default=1000, help="number of parameters in the file")
+    parser.add_argument("--threads", default="1,2,4,8", help="comma separated numbers of reader threads")
+    parser.add_argument("--duration", type=float, default=2.0, help="seconds to run each test")
+    parser.add_argument("--json", action="store_true", help="print the results as JSON")
+    options = parser.parse_args()
+
+    # Params reads the system arguments, so remove the benchmark options
+    sys.argv = sys.argv[:1]
+
+    results = []
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "bench.para")
+        create_file(path, options.keys)
+        params = Params(para = path, headless = True, cache = False)
+        keys = ["key_%d" % i for i in range(0, min(options.keys, 16))] + ["pair_a", "pair_b"]
+
+        for threads in [int(t) for t in options.threads.split(",")]:
+            rate, torn = run(params, threads, options.duration, keys)
+            results.append({"threads": threads, "reads_per_second": rate, "torn_reads": torn})
+
+    # Print the results
+    if options.json:
+        print(json.dumps(results, indent=2))
+    else:
+        base = results[0]["reads_per_second"]
+        for r in results:
+            print("%2d threads: %12.0f reads/s  (%.2fx)  torn reads: %d" %
+                (r["threads"], r["reads_per_second"], r["reads_per_second"] / base, r["torn_reads"]))
+
+
+
+if __name__ == "__main__":
+    main()
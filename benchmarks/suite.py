@@ -0,0 +1,278 @@
+#!/usr/bin/python3
+
+# Benchmark suite for constructing, reading, looking up and writing parameters
+# Run from the directory containing the package:
+#   python3 -m params.benchmarks.suite --sizes 10,1000,100000 --output results.json
+#   python3 -m params.benchmarks.suite --baseline results.json --threshold 0.25
+
+import os
+import sys
+import json
+import time
+import platform
+import argparse
+import tempfile
+from ..params import Params
+from ..file import ParamFile
+from ..locator import Locator
+from ..compress import Compression, zstandard
+
+
+
+############################################################
+
+# Creates a parameter file with a number of parameters of each type
+def create_file (path, count):
+    kinds = ("%d", "%d.5", "text_%d", "True")
+    with open(path, "w") as file:
+        file.write("# Benchmark parameter file\n")
+        for i in range(0, count):
+            value = kinds[i % 4] % i if i % 4 != 3 else kinds[3]
+            options = "low, medium, high" if i % 10 == 0 else ""
+            file.write("key_%d | Key %d | %s | %s | %s\n" % (i, i, value, "flag" if i % 4 == 3 else "", options))
+        file.write("array | Array | %s | |\n" % ", ".join([str(i) for i in range(0, 100)]))
+
+
+
+############################################################
+
+# Creates a deep directory tree with a parameter file in the last directory
+# Returns the directory path of the parameter file
+def create_tree (root, depth, width):
+    path = root
+    for d in range(0, depth):
+        for w in range(0, width):
+            os.makedirs(os.path.join(path, "dir_%d" % w), exist_ok=True)
+            with open(os.path.join(path, "dir_%d" % w, "data_%d.txt" % d), "w") as file:
+                file.write("data\n")
+        path = os.path.join(path, "dir_%d" % (width - 1))
+    create_file(os.path.join(path, "tree.para"), 10)
+    return path
+
+
+
+############################################################
+
+# Times a function, returning the fastest time of a number of repeats in seconds
+# The setup function is called before each repeat and is not timed
+def measure (function, repeat = 5, number = 1, setup = None):
+    best = None
+    for _ in range(0, repeat):
+        if setup is not None:
+            setup()
+        start = time.perf_counter()
+        for _ in range(0, number):
+            function()
+        elapsed = (time.perf_counter() - start) / number
+        if best is None or elapsed < best:
+            best = elapsed
+    return best
+
+
+
+############################################################
+
+# Runs all of the benchmarks for a number of parameters
+# Returns a dictionary of benchmark names and times in seconds
+def run_size (directory, size):
+    results = {}
+    path = os.path.join(directory, "bench_%d.para" % size)
+    create_file(path, size)
+    repeat = 5 if size <= 100000 else 2
+    keys = ["key_%d" % i for i in range(0, min(size, 1000))]
+
+    # Reading the file, without and with the compiled cache
+    def read (cache):
+        reader = ParamFile.__new__(ParamFile)
+        ParamFile.__init__(reader, path, Locator(index = False), True, cache)
+        return reader
+    results["read_file.parse[%d]" % size] = measure(lambda: read(False), repeat)
+    read(True)
+    results["read_file.cached[%d]" % size] = measure(lambda: read(True), repeat)
+
+    # Constructing the parameters
+    results["params.construct[%d]" % size] = measure(lambda: Params(para = path, headless = True), repeat)
+    results["params.construct_lazy[%d]" % size] = measure(lambda: Params(para = path, headless = True, lazy = True), repeat)
+
+    # Looking up values
+    params = Params(para = path, headless = True)
+    number = max(1, 100000 // len(keys))
+    def get ():
+        for key in keys:
+            params.get(key)
+    results["params.get[%d]" % size] = measure(get, repeat, number) / len(keys)
+    results["params.get_array[%d]" % size] = measure(lambda: params.get_array("array"), repeat, 1000)
+    results["params.get_all[%d]" % size] = measure(params.get_all, repeat, 100)
+
+    # Writing a single changed value
+    reader = read(False)
+    value = [0]
+    def change ():
+        value[0] += 1
+        reader.set("key_0", value[0])
+    results["write_file.one_change[%d]" % size] = measure(reader.write_file, repeat, 1, change)
+    results["write_file.unchanged[%d]" % size] = measure(reader.write_file, repeat, 100)
+
+    os.remove(path)
+    return results
+
+
+
+############################################################
+
+# Runs the benchmarks for reading compressed files against the uncompressed file
+# The bytes read from the disk are reported along with the times
+def run_compressed (directory, size):
+    results = {}
+    path = os.path.join(directory, "compressed_%d.para" % size)
+    create_file(path, size)
+    with open(path, "rb") as file:
+        data = file.read()
+
+    # Zstandard is only benchmarked if it is installed
+    kinds = [""] + [k for k in Compression.ENDINGS if k != ".zst" or zstandard is not None]
+    for kind in kinds:
+        if kind != "":
+            with open(path + kind, "wb") as file:
+                file.write(Compression.compress(data, kind))
+
+        def read (cache):
+            reader = ParamFile.__new__(ParamFile)
+            ParamFile.__init__(reader, path + kind, Locator(index = False), True, cache)
+            return reader
+        name = kind.strip(".") or "plain"
+        results["read_file.parse_%s[%d]" % (name, size)] = measure(lambda: read(False), 5)
+        read(True)
+        results["read_file.cached_%s[%d]" % (name, size)] = measure(lambda: read(True), 5)
+        results["read_file.bytes_%s[%d]" % (name, size)] = os.path.getsize(path + kind)
+
+        if kind != "":
+            os.remove(path + kind)
+
+    os.remove(path)
+    return results
+
+
+
+############################################################
+
+# Runs the benchmarks for finding a file in a deep directory tree
+def run_tree (directory, depth, width):
+    results = {}
+    root = os.path.join(directory, "tree")
+    create_tree(root, depth, width)
+
+    # Find the file from within the tree
+    current = os.getcwd()
+    os.chdir(root)
+    try:
+        reader = ParamFile.__new__(ParamFile)
+        reader.headless = True
+        def find (index):
+            reader.locator = Locator(".", index = index)
+            return reader.find_file("tree.para")
+        name = "find_file.%s[%dx%d]"
+        results[name % ("walk", depth, width)] = measure(lambda: find(False), 5)
+        find(True)
+        results[name % ("indexed", depth, width)] = measure(lambda: find(True), 5)
+    finally:
+        os.chdir(current)
+
+    return results
+
+
+
+############################################################
+
+# Runs the benchmark for parsing a long list of command line arguments
+def run_parse (count):
+    args = []
+    for i in range(0, count):
+        args += ["-key_%d" % i, str(i) if i % 3 else "-%d" % i]
+        if i % 5 == 0:
+            args.append("-flag_%d" % i)
+
+    params = Params.__new__(Params)
+    parse = params._Params__parse
+    return {"params.parse[%d]" % count: measure(lambda: parse(args), 5)}
+
+
+
+############################################################
+
+# Compares the results with a baseline
+# Returns the list of benchmarks that are slower than the threshold allows
+def compare (results, baseline, threshold):
+    regressions = []
+    for name, base in baseline.items():
+        if name not in results or base <= 0:
+            continue
+        ratio = results[name] / base
+        if ratio > 1.0 + threshold:
+            regressions.append({"name": name, "baseline": base, "current": results[name], "ratio": ratio})
+    return regressions
+
+
+
+############################################################
+
+# Runs the benchmark suite
+def main ():
+    parser = argparse.ArgumentParser(description="Benchmark suite for Params")
+    parser.add_argument("--sizes", default="10,1000,100000,1000000", help="comma separated numbers of parameters")
+    parser.add_argument("--depth", type=int, default=30, help="depth of the directory tree for find_file")
+    parser.add_argument("--width", type=int, default=20, help="directories in each level of the tree")
+    parser.add_argument("--compressed", default="1000,100000", help="comma separated numbers of parameters for the compressed files")
+    parser.add_argument("--argv", type=int, default=10000, help="number of command line arguments to parse")
+    parser.add_argument("--output", help="file to write the JSON results to")
+    parser.add_argument("--baseline", help="JSON results to compare against")
+    parser.add_argument("--threshold", type=float, default=0.25, help="allowed slowdown against the baseline (0.25 = 25%%)")
+    options = parser.parse_args()
+
+    # Params reads the system arguments, so remove the benchmark options
+    sys.argv = sys.argv[:1]
+
+    results = {}
+    with tempfile.TemporaryDirectory() as directory:
+
+        # Keep the cache separate from the user cache
+        os.environ["PARAMS_CACHE_DIR"] = os.path.join(directory, "cache")
+
+        for size in [int(s) for s in options.sizes.split(",") if s.strip() != ""]:
+            results.update(run_size(directory, size))
+        for size in [int(s) for s in options.compressed.split(",") if s.strip() != ""]:
+            results.update(run_compressed(directory, size))
+        results.update(run_tree(directory, options.depth, options.width))
+        results.update(run_parse(options.argv))
+
+    # Create the report
+    report = {
+        "meta": {
+            "python":   platform.python_version(),
+            "platform": platform.platform(),
+            "time":     time.strftime("%Y-%m-%dT%H:%M:%S"),
+        },
+        "results": results,
+    }
+
+    # Compare with the baseline
+    failed = False
+    if options.baseline:
+        with open(options.baseline) as file:
+            baseline = json.load(file)["results"]
+        report["regressions"] = compare(results, baseline, options.threshold)
+        failed = len(report["regressions"]) > 0
+
+    # Write the report
+    output = json.dumps(report, indent=2, sort_keys=True)
+    if options.output:
+        with open(options.output, "w") as file:
+            file.write(output + "\n")
+    print(output)
+
+    sys.exit(1 if failed else 0)
+
+
+
+if __name__ == "__main__":
+    main()
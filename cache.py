@@ -0,0 +1,203 @@
+import os
+import time
+import pickle
+import hashlib
+import tempfile
+
+# Class that handles the on-disk cache directory and safe file publishing
+class Cache:
+
+
+    ############################################################
+    # DEFINED CONSTANTS
+
+    # The environment variable that can override the cache directory
+    ENV_DIR = "PARAMS_CACHE_DIR"
+
+    # The name of the sub-directory used within the user cache
+    NAME = "params"
+
+    # The version of the stored cache entries
+    VERSION = 4
+
+    # The nanoseconds within which a file can change without changing its modification time
+    # Entries stored within this time of the last change of the file also check its content
+    GRANULARITY = 2 * 10**9
+
+
+
+    ############################################################
+
+    # Returns the directory used for storing cached data
+    # The directory is created if it does not exist
+    @staticmethod
+    def directory () -> str:
+
+        # Check for an overriden cache directory
+        path = os.environ.get(Cache.ENV_DIR)
+
+        # Otherwise use the standard user cache
+        if not path:
+            base = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+            path = os.path.join(base, Cache.NAME)
+
+        # Make sure the directory exists
+        os.makedirs(path, exist_ok=True)
+        return path
+
+
+
+    ############################################################
+
+    # Returns a path within the cache directory for some source object
+    # Takes in a source (such as a file path) and the file extension
+    @staticmethod
+    def path (source, ending) -> str:
+        name = hashlib.blake2b(os.path.abspath(str(source)).encode(), digest_size=16).hexdigest()
+        return os.path.join(Cache.directory(), name + ending)
+
+
+
+    ############################################################
+
+    # Writes data to a file atomically by writing a temporary file and renaming it
+    # Readers will either see the old file or the new file, never a partial one
+    @staticmethod
+    def atomic_write (path, data, mode = "w"):
+
+        # Write through symbolic links, so the link is kept and its target is replaced
+        path = os.path.realpath(path)
+
+        # Create the temporary file in the same directory so the rename is atomic
+        directory = os.path.dirname(path)
+        fd, temp = tempfile.mkstemp(dir=directory, prefix="." + os.path.basename(path) + ".", suffix=".tmp")
+
+        # Attempt to write the data
+        try:
+            with os.fdopen(fd, mode) as out:
+                if isinstance(data, (str, bytes)):
+                    out.write(data)
+                else:
+                    out.writelines(data)
+                out.flush()
+                os.fsync(out.fileno())
+
+            # Keep the permissions of the existing file
+            # New files use the default permissions instead of the private temporary ones
+            if os.path.exists(path):
+                os.chmod(temp, os.stat(path).st_mode & 0o7777)
+            else:
+                umask = os.umask(0)
+                os.umask(umask)
+                os.chmod(temp, 0o666 & ~umask)
+
+            # Publish the new file
+            os.replace(temp, path)
+
+        # Remove the temporary file on any failure
+        except BaseException:
+            if os.path.exists(temp):
+                os.remove(temp)
+            raise
+
+
+
+    ############################################################
+
+    # Returns the content hash of some data
+    @staticmethod
+    def digest (data) -> str:
+        return hashlib.blake2b(data, digest_size=16).hexdigest()
+
+
+
+    ############################################################
+
+    # Returns the content hash of a file, which is read in chunks so large files are never
+    # read into memory at once
+    @staticmethod
+    def digest_file (path) -> str:
+        digest = hashlib.blake2b(digest_size=16)
+        with open(path, "rb") as file:
+            for chunk in iter(lambda: file.read(1024 * 1024), b""):
+                digest.update(chunk)
+        return digest.hexdigest()
+
+
+
+    ############################################################
+
+    # Loads a cached value that was compiled from a source file
+    # The entry is valid if the size and modification time of the source match,
+    # or if the size matches and the content hash of the source is unchanged
+    # The modification time is only trusted if the entry was stored long enough after the
+    # last change, as a change within the same tick of the clock keeps the same time
+    # Returns the value or None if there is no valid entry
+    @staticmethod
+    def load (source, ending, stat = None) -> object:
+
+        # Get the current state of the source file
+        if stat is None:
+            stat = os.stat(source)
+
+        # Attempt to read the cache entry, ignoring any invalid entries
+        # The header is stored first so a stale value is never loaded
+        # A cache directory that cannot be created is the same as a missing entry
+        try:
+            path = Cache.path(source, ending)
+            with open(path, "rb") as file:
+                header = pickle.load(file)
+
+                # Check the entry against the source file
+                if header.get("version") != Cache.VERSION or header["size"] != stat.st_size:
+                    return None
+                trusted = header["mtime"] == stat.st_mtime_ns and header.get("stored", 0) - header["mtime"] >= Cache.GRANULARITY
+                if not trusted and Cache.digest_file(source) != header["hash"]:
+                    return None
+
+                data = file.read()
+                value = pickle.loads(data)
+        except Exception:
+            return None
+
+        # Store the new state of the source, so the content is not checked again
+        now = time.time_ns()
+        if not trusted and now - stat.st_mtime_ns >= Cache.GRANULARITY:
+            header["mtime"] = stat.st_mtime_ns
+            header["stored"] = now
+            try:
+                Cache.atomic_write(path, pickle.dumps(header, pickle.HIGHEST_PROTOCOL) + data, "wb")
+            except OSError:
+                pass
+
+        return value
+
+
+
+    ############################################################
+
+    # Stores a value that was compiled from the data of a source file
+    # If the data has already been hashed while reading, the data can be None and the hash given instead
+    # Failing to store the value is ignored, as the cache is only an optimisation
+    @staticmethod
+    def store (source, ending, value, data, stat = None, digest = None):
+        if stat is None:
+            stat = os.stat(source)
+
+        header = {
+            "version":  Cache.VERSION,
+            "size":     len(data) if data is not None else stat.st_size,
+            "mtime":    stat.st_mtime_ns,
+            "hash":     Cache.digest(data) if data is not None else digest,
+            "stored":   time.time_ns(),
+        }
+
+        try:
+            entry = pickle.dumps(header, pickle.HIGHEST_PROTOCOL) + pickle.dumps(value, pickle.HIGHEST_PROTOCOL)
+            Cache.atomic_write(Cache.path(source, ending), entry, "wb")
+        except (OSError, pickle.PicklingError):
+            pass
+
+
+
+    ############################################################
@@ -0,0 +1,172 @@
+import gzip
+import lzma
+import hashlib
+
+# Zstandard is optional and is only needed for .zst files
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+# Class that reads and writes compressed parameter files
+# The compression is found from the file ending, or from the first bytes of the file
+class Compression:
+
+
+    ############################################################
+    # DEFINED CONSTANTS
+
+    # The endings of the compressed files, in the order they are searched for
+    ENDINGS = (".gz", ".xz", ".zst")
+
+    # The first bytes of each kind of compressed file
+    MAGIC = {
+        ".gz":  b"\x1f\x8b",
+        ".xz":  b"\xfd7zXZ\x00",
+        ".zst": b"\x28\xb5\x2f\xfd",
+    }
+
+
+
+    ############################################################
+
+    # Returns the kind of compression of a file (".gz", ".xz" or ".zst"), or None if it is not compressed
+    @staticmethod
+    def kind (path):
+        for ending in Compression.ENDINGS:
+            if path.endswith(ending):
+                return ending
+
+        # Check the first bytes of files without a compressed ending
+        try:
+            with open(path, "rb") as file:
+                start = file.read(6)
+        except OSError:
+            return None
+        for ending, magic in Compression.MAGIC.items():
+            if start.startswith(magic):
+                return ending
+        return None
+
+
+
+    ############################################################
+
+    # Returns a binary file that decompresses the data of another binary file as it is read
+    # Takes in the compressed file and the kind of compression
+    @staticmethod
+    def reader (file, kind):
+        if kind == ".gz":
+            return gzip.GzipFile(fileobj=file, mode="rb")
+        if kind == ".xz":
+            return lzma.LZMAFile(file, "rb")
+        if kind == ".zst":
+            Compression.__require(kind)
+            return zstandard.ZstdDecompressor().stream_reader(file, closefd=False)
+        raise ValueError("Unknown compression '%s'." % kind)
+
+
+
+    ############################################################
+
+    # Compresses data for writing a file
+    # Returns the compressed bytes
+    @staticmethod
+    def compress (data: bytes, kind) -> bytes:
+        if kind == ".gz":
+            return gzip.compress(data, mtime=0)
+        if kind == ".xz":
+            return lzma.compress(data)
+        if kind == ".zst":
+            Compression.__require(kind)
+            return zstandard.ZstdCompressor().compress(data)
+        raise ValueError("Unknown compression '%s'." % kind)
+
+
+
+    ############################################################
+
+    # Raises an error if the module for a kind of compression is not installed
+    @staticmethod
+    def __require (kind):
+        if kind == ".zst" and zstandard is None:
+            raise ImportError("The zstandard module is required for '.zst' parameter files.")
+
+
+
+    ############################################################
+
+
+
+# Class that reads a binary file while counting the bytes and hashing the data
+# This is used to find the content hash of a compressed file while it is decompressed
+class HashingReader:
+
+
+    ############################################################
+
+    # Constructor for the reader
+    # Takes in the binary file to read
+    def __init__ (self, file):
+        self.file = file
+        self.hash = hashlib.blake2b(digest_size=16)
+        self.size = 0
+
+
+
+    ############################################################
+
+    # Reads up to a number of bytes from the file
+    def read (self, size = -1) -> bytes:
+        data = self.file.read(size)
+        self.hash.update(data)
+        self.size += len(data)
+        return data
+
+
+
+    ############################################################
+
+    # Reads bytes into a buffer and returns the number of bytes read
+    def readinto (self, buffer) -> int:
+        count = self.file.readinto(buffer)
+        self.hash.update(memoryview(buffer)[:count])
+        self.size += count
+        return count
+
+
+
+    ############################################################
+
+    # Returns the content hash of the data that has been read
+    def digest (self) -> str:
+        return self.hash.hexdigest()
+
+
+
+    ############################################################
+
+    # Returns whether the file can be read
+    def readable (self) -> bool:
+        return True
+
+
+
+    ############################################################
+
+    # Returns whether the file can be moved within, which is never the case as the data is hashed in order
+    def seekable (self) -> bool:
+        return False
+
+
+
+    ############################################################
+
+    # Returns whether the file has been closed
+    @property
+    def closed (self) -> bool:
+        return self.file.closed
+
+
+
+    ############################################################
@@ -1,6 +1,19 @@
 import os
+import io
+import re
+import mmap
+import locale
+import functools
+import threading
+from contextlib import contextmanager
 from .argument import Arg
 from .color import Color
+from .locator import Locator
+from .cache import Cache
+from .lock import FileLock
+from .journal import Journal
+from .compress import Compression, HashingReader
+from .stats import Stats
 
 # Class that reads a file and creates a list of parameters based on the file
 class ParamFile:
@@ -14,21 +27,66 @@ class ParamFile:
     IGNORED_CHARS = ('#', '/')
     FILE_ENDING = ".para"
 
+    # The ending of the compiled files within the cache
+    COMPILED_ENDING = ".parac"
+
+    # The ending of the key offset indexes within the cache
+    OFFSETS_ENDING = ".paraidx"
+
+    # The environment variable that disables all interactive prompts
+    HEADLESS_ENV = "PARAMS_HEADLESS"
+
+    # The number of seconds to wait for other processes to finish writing the file
+    LOCK_TIMEOUT = 10.0
+
 
 
     ############################################################
 
     # Constructor for reading the file
-    # Takes in a para file
-    def __init__ (self, file = "input" + FILE_ENDING):
+    # Takes in a para file, an optional locator for searching for the file,
+    # whether to fail instead of prompting the user (headless), whether to use
+    # the compiled cache of the file, the statistics to record to (optional) and
+    # whether to save changes to a journal, or the journal size before compacting (optional)
+    def __init__ (self, file = "input" + FILE_ENDING, locator = None, headless = None, cache = True, stats = None, journal = None):
+
+        # Store the search options
+        self.stats = stats if stats is not None else Stats(False)
+        self.locator = locator if locator is not None else Locator(stats = self.stats)
+        self.headless = self.is_headless() if headless is None else bool(headless)
+        self.cache = cache
+
+        # The lock that serialises all changes, and the version of the current arguments
+        # Changes create new arguments and swap them in, so readers never need the lock
+        self.lock = threading.RLock()
+        self.version = 0
+
+        # The size and modification time of the file when it was last read or written
+        self.disk = None
+
+        # The keys with values in the journal, and the thread compacting the journal
+        self.journaled = set()
+        self.compactor = None
 
         # Get the file from the directory
-        self.path = self.find_file(file)
+        with self.stats.phase("find_file"):
+            self.path = self.find_file(file)
+        self.journal = Journal(self.path, journal)
+
+        # The changes waiting for the lock, which are written by whichever process holds it
+        self.pending = Journal(self.path, None, ".pending")
 
         # Initialise the arguments and the lines dictionary
         self.args = {}
         self.lines = {}
-        
+
+        # The width of each column and the text of each argument line in the file
+        self.widths = [0] * 5
+        self.text = {}
+
+        # The functions called with the changed keys whenever values change
+        self.listeners = []
+
         # Reads the file and parses it into the arguments
         self.read_file(self.path)
 
@@ -45,12 +103,25 @@ class ParamFile:
         if "." not in file:
             file = file + self.FILE_ENDING
 
-        # Walk through the files in the directory looking for the filename
-        for subdir, dirs, files in os.walk("."):
+        # The compressed files are used if there is no uncompressed file
+        files = [file]
+        if file.endswith(self.FILE_ENDING):
+            files += [file + ending for ending in Compression.ENDINGS]
+
+        # Use the path directly if it points to an existing file
+        if os.path.dirname(file) != "":
             for f in files:
-                # If the file exists, return the path
-                if f == file:
-                    return subdir + "/" + f
+                if os.path.isfile(f):
+                    return f
+
+        # Search the roots of the locator for the filename
+        path = self.locator.find([os.path.basename(f) for f in files])
+        if path is not None:
+            return path
+
+        # Fail without prompting if running headless
+        if self.headless:
+            raise FileNotFoundError("Unable to find parameter file '%s'." % file)
 
         # If no files found, ask the user if they want to create a file
         c_in = input("%sWARNING: Unable to find parameter file. Would you like to create one? y/n:%s " % (Color.WARNING, Color.END)).lower()[0]
@@ -77,86 +148,626 @@ class ParamFile:
         if not os.path.exists(path):
             raise FileNotFoundError("File path '%s' does not exist." % path)
 
-        # Opens the file from the current path
-        with open(path) as file:
+        # Attempt to use the compiled file if it is unchanged
+        stat = os.stat(path)
+        with self.stats.phase("load_cache"):
+            compiled = Cache.load(path, self.COMPILED_ENDING, stat) if self.cache else None
 
-            # Attempt to read the file
-            try:
-                # Read each of the lines and strip the spaces from the lines
-                for idx, line in enumerate(file.readlines()):
-                    line = line.strip()
+        # Otherwise parse the file and store the compiled result
+        if compiled is None:
+            kind = Compression.kind(path)
+            digest = None
 
-                    # Ignore empty lines and comment lines
-                    if len(line) < 2:
-                        continue
-                    if line[0] in self.IGNORED_CHARS:
-                        continue
+            # Compressed files are parsed while they are decompressed
+            if kind is not None:
+                with self.stats.phase("read_file"):
+                    compiled, raw = self.__read_compressed(path, kind)
+                self.stats.count("bytes_read", raw.size)
+                data, digest = None, raw.digest()
+
+            else:
+                with self.stats.phase("read_file"):
+                    with open(path, "rb") as file:
+                        data = file.read()
+                    self.stats.count("bytes_read", len(data))
+
+                with self.stats.phase("parse"):
+                    compiled = self.parse_lines(io.TextIOWrapper(io.BytesIO(data)).readlines())
+
+            if self.cache:
+                with self.stats.phase("store_cache"):
+                    Cache.store(path, self.COMPILED_ENDING, compiled, data, stat, digest)
+                self.stats.count("cache_misses")
+        else:
+            self.stats.count("cache_hits")
+
+        # Add the arguments and lines from the file
+        args, lines, widths, text = compiled
+
+        # Store the state of the file that was read, and apply the journal
+        if path == self.path:
+            self.disk = (stat.st_size, stat.st_mtime_ns)
+            args = self.__journaled(args)
+        self.__own(args)
+        self.args.update(args)
+        self.lines.update(lines)
+        self.text.update(text)
+        for i in range(0, 5):
+            if widths[i] > self.widths[i]:
+                self.widths[i] = widths[i]
+
+        # Returns the argument dictionary
+        return self.args
+
+
+
+    ############################################################
+
+    # Reads the file again after it has changed
+    # Only the lines that are different from the last read are parsed again
+    # Values that have been changed but not saved are kept over the values in the file
+    # The new arguments are swapped in at once, so readers see either the old or new arguments
+    # Returns the set of keys that have changed
+    def reload (self) -> set:
+
+        with self.lock:
+
+            # Keep the values that have not been saved yet
+            changes = dict([(key, arg.value) for key, arg in self.args.items() if arg.dirty])
+
+            # Read the current file and parse the changed lines
+            stat = os.stat(self.path)
+            kind = Compression.kind(self.path)
+            digest = None
+            with self.stats.phase("reload"):
+                if kind is not None:
+                    compiled, raw = self.__read_compressed(self.path, kind, reuse = True)
+                    data, digest = None, raw.digest()
+                else:
+                    with open(self.path, "rb") as file:
+                        data = file.read()
+                    compiled = self.parse_lines(io.TextIOWrapper(io.BytesIO(data)).readlines(), reuse = True)
+            args, lines, widths, text = compiled
+            self.stats.count("reloads")
+            if self.cache:
+                Cache.store(self.path, self.COMPILED_ENDING, compiled, data, stat, digest)
+            args = self.__journaled(args)
+            self.__own(args)
+
+            # Apply the unsaved values again, unless the file already has the value
+            for key, value in changes.items():
+                arg = args.get(key)
+                if arg is None or (type(arg.value) is type(value) and arg.value == value):
+                    continue
+                if args is compiled[0]:
+                    args = dict(args)
+                arg = arg.copy()
+                arg.value = value
+                args[key] = arg
+
+            # Find the keys that have changed or been removed
+            keys = set()
+            for key in set(self.args.keys()) | set(args.keys()):
+                if self.args.get(key) is not args.get(key):
+                    keys.add(key)
+
+            # Swap in the new arguments
+            self.disk = (stat.st_size, stat.st_mtime_ns)
+            self.widths = [max(w) for w in zip(self.widths, widths)]
+            self.text = text
+            self.lines = lines
+            self.args = args
+
+            # Tell the listeners about the changed keys
+            if len(keys) > 0:
+                self.version += 1
+                self.notify(keys)
+            return keys
+
+
+
+    ############################################################
+
+    # Sets the owner of the arguments, so that changing a value in place tells the listeners
+    def __own (self, args):
+        for arg in args.values():
+            arg.owner = self
 
-                    # Read the para
-                    info = line.split("|")
 
-                    # Check for invalid lines
-                    if len(info) != 5:
+
+    ############################################################
+
+    # Tells the listeners about an argument whose value was changed in place
+    # Arguments that are not in the current arguments, such as copies being changed, are ignored
+    def changed (self, arg):
+        with self.lock:
+            if self.args.get(arg.key) is arg:
+                self.version += 1
+                self.notify({arg.key})
+
+
+
+    ############################################################
+
+    # Parses a compressed file while it is decompressed, without reading the whole file first
+    # Takes in the path, the kind of compression and whether to reuse the current arguments
+    # Returns the parsed file and the reader of the compressed data, which has its size and hash
+    def __read_compressed (self, path, kind, reuse = False) -> tuple:
+        with open(path, "rb") as file:
+            raw = HashingReader(file)
+            with Compression.reader(raw, kind) as stream:
+                compiled = self.parse_lines(io.TextIOWrapper(stream), reuse)
+
+            # Read any remaining data, so the hash is of the whole file
+            while raw.read(65536):
+                pass
+
+        return compiled, raw
+
+
+
+    ############################################################
+
+    # Parses the lines of a file into arguments
+    # Takes in the list of lines from the file and whether to reuse the current
+    # arguments for the lines that have not changed
+    # Returns the arguments, the lines of each argument, the width of each column
+    # and the text of each argument line
+    def parse_lines (self, filelines, reuse = False) -> tuple:
+        args = {}
+        lines = {}
+        widths = [0] * 5
+        text = {}
+
+        # Attempt to read the file
+        try:
+            # Read each of the lines
+            for idx, line in enumerate(filelines):
+
+                # Use the current argument if the line is the same
+                # Changed arguments are parsed again, as their value is not the value in the file
+                if reuse and idx in self.lines:
+                    stripped = line.strip()
+                    key = self.lines[idx]
+                    if self.text.get(idx) == stripped and key in self.args and not self.args[key].dirty:
+                        args[key] = self.args[key]
+                        lines[idx] = key
+                        text[idx] = stripped
                         continue
 
-                    # Remove the spaces in the information
-                    info = [i.strip() for i in info]
+                info = self.parse_line(line)
+                if info is None:
+                    continue
 
-                    # Create the options list for info [4]
-                    opts = [o.strip() for o in info[4].split(",")]
+                # Update the column widths
+                for i in range(0, 5):
+                    if len(info[i]) > widths[i]:
+                        widths[i] = len(info[i])
 
-                    # Create the argument
-                    arg = Arg(info[0], info[1], info[2], info[3], opts)
+                # Create the argument
+                arg = self.create_arg(info)
 
-                    # Add the argument
-                    self.args[arg.key] = arg
+                # Add the argument
+                args[arg.key] = arg
 
-                    # Store the line
-                    self.lines[idx] = arg.key
-            
-            # Raise an exception if an invalid file
-            except:
-                raise Exception("Failed to Parse parameter file.")
+                # Store the line
+                lines[idx] = arg.key
+                text[idx] = line.strip()
 
-        # Returns the argument dictionary
-        return self.args
+        # Raise an exception if an invalid file
+        except:
+            raise Exception("Failed to Parse parameter file.")
+
+        self.stats.count("lines_parsed", len(text))
+        return args, lines, widths, text
+
+
+
+    ############################################################
+
+    # Splits a line of the file into the information of an argument
+    # Returns the list of the five columns, or None if the line is not an argument
+    @classmethod
+    def parse_line (cls, line) -> list:
+
+        # Strip the spaces from the line
+        line = line.strip()
+
+        # Ignore empty lines and comment lines
+        if len(line) < 2:
+            return None
+        if line[0] in cls.IGNORED_CHARS:
+            return None
+
+        # Read the para
+        info = line.split("|")
+
+        # Check for invalid lines
+        if len(info) != 5:
+            return None
+
+        # Remove the spaces in the information
+        return [i.strip() for i in info]
+
+
+
+    ############################################################
+
+    # Creates an argument from the information of a line
+    @staticmethod
+    def create_arg (info) -> Arg:
+
+        # Create the options list for info [4]
+        opts = [o.strip() for o in info[4].split(",")]
+
+        # Create the argument
+        return Arg(info[0], info[1], info[2], info[3], opts)
+
+
+
+    ############################################################
+
+    # Iterates through the arguments of a file without reading the whole file
+    # The file is memory-mapped and each argument is parsed when it is reached
+    # Takes in a valid path to the file
+    # Yields each argument in the order of the file
+    @classmethod
+    def iter_params (cls, path):
+        for idx, offset, info in cls.__scan(path):
+            yield cls.create_arg(info)
+
+
+
+    ############################################################
+
+    # Finds a single argument in a file without reading all of the arguments
+    # Without an index, the memory-mapped file is searched for the lines starting with the key.
+    # With an index, the offsets of every key are stored in the cache and the line is read directly.
+    # Takes in a valid path to the file, the key and whether to use the offset index
+    # Returns the argument, or None if the key does not exist
+    @classmethod
+    def find_param (cls, path, key, index = False) -> Arg:
+        key = str(key).lower()
+
+        # Use the offset of the key from the index
+        # Compressed files cannot be read from an offset, so they are always searched
+        compressed = Compression.kind(path) is not None
+        if index and not compressed:
+            offsets = cls.offsets(path)
+            if key not in offsets:
+                return None
+            with open(path, "rb") as file:
+                file.seek(offsets[key])
+                info = cls.parse_line(file.readline().decode(cls.encoding()))
+            return cls.create_arg(info)
+
+        # Search for the lines starting with the key, where the last line is used
+        found = None
+        if compressed:
+            for idx, offset, info in cls.__scan(path):
+                if info[0].lower() == key:
+                    found = info
+            return cls.create_arg(found) if found is not None else None
+
+        pattern = re.compile(rb"^[ \t]*" + re.escape(key.encode(cls.encoding())) + rb"[ \t]*\|", re.MULTILINE | re.IGNORECASE)
+        with open(path, "rb") as file:
+            if os.fstat(file.fileno()).st_size == 0:
+                return None
+            with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                for match in pattern.finditer(mm):
+                    end = mm.find(b"\n", match.start())
+                    line = mm[match.start():end if end >= 0 else len(mm)]
+                    info = cls.parse_line(line.decode(cls.encoding()))
+                    if info is not None and info[0].lower() == key:
+                        found = info
+
+        return cls.create_arg(found) if found is not None else None
+
+
+
+    ############################################################
+
+    # Reads the values of a file without locating, locking or writing it
+    # Takes in a valid path to the file
+    # Returns a dictionary of the keys and values, where the last line of each key is used
+    # Only the values are converted, as no arguments are created
+    @classmethod
+    def read_values (cls, path) -> dict:
+        values = {}
+        for idx, offset, info in cls.__scan(path):
+            values[info[0].lower()] = Arg.convert(info[2])
+        return values
+
+
+
+    ############################################################
+
+    # Reads the values of many files into a single table, without writing any of the files
+    # The files are read across a pool of processes, or in this process with a single worker
+    # Takes in the list of paths, the number of processes (all of the processors by default)
+    # and the kind of table, which is "dict", "numpy" or "pandas"
+    # Returns a table with a column for every key in any of the files and a row for each path in order
+    # Missing values are None in a "dict", masked in a "numpy" table and missing (NaN) in a "pandas" table
+    @classmethod
+    def load_many (cls, paths, workers = None, kind = "dict"):
+        paths = list(paths)
+        workers = workers if workers is not None else os.cpu_count() or 1
+        workers = max(1, min(workers, len(paths)))
+
+        # Send the files to each process in chunks, as each file is quick to read
+        if workers == 1:
+            rows = [cls.read_values(path) for path in paths]
+        else:
+
+            # The process pool is slow to import, so it is only imported when needed
+            from concurrent.futures import ProcessPoolExecutor
+            with ProcessPoolExecutor(workers) as executor:
+                chunk = max(1, len(paths) // (workers * 4))
+                rows = list(executor.map(cls.read_values, paths, chunksize = chunk))
+
+        # Create a column for every key, in the order the keys are first found
+        columns = {}
+        for row in rows:
+            for key in row:
+                if key not in columns:
+                    columns[key] = None
+        for key in columns:
+            columns[key] = [row.get(key) for row in rows]
+
+        if kind == "dict":
+            return columns
+        if kind == "numpy":
+            return dict([(key, cls.__masked(column)) for key, column in columns.items()])
+        if kind == "pandas":
+
+            # Pandas is slow to import, so it is only imported when needed
+            import pandas
+            return pandas.DataFrame(columns, index = pandas.Index(paths, name = "path"))
+        raise ValueError("Unknown kind of table '%s'." % kind)
+
+
+
+    ############################################################
+
+    # Creates a masked array from a column of values, where the missing values are masked
+    # The array is boolean, integer or float if all of the values are, otherwise an object array
+    @staticmethod
+    def __masked (column: list):
+
+        # NumPy is optional and slow to import, so it is only imported when needed
+        try:
+            import numpy
+        except ImportError:
+            raise ImportError("NumPy is required for 'numpy' tables.")
+
+        mask = [value is None for value in column]
+        types = set([type(value) for value in column if value is not None])
+        if types == {bool}:
+            dtype, fill = bool, False
+        elif types == {int}:
+            dtype, fill = numpy.int64, 0
+        elif len(types) > 0 and types <= {int, float}:
+            dtype, fill = numpy.float64, numpy.nan
+        else:
+            dtype, fill = object, None
+
+        data = [fill if value is None else value for value in column]
+        return numpy.ma.masked_array(numpy.array(data, dtype = dtype), mask = mask)
+
+
+
+    ############################################################
+
+    # Returns the byte offset of the line of every key in a file
+    # The offsets are stored in the cache and are rebuilt whenever the file changes
+    @classmethod
+    def offsets (cls, path) -> dict:
+        offsets = Cache.load(path, cls.OFFSETS_ENDING)
+        if offsets is not None:
+            return offsets
+
+        # Scan the file for the offsets
+        stat = os.stat(path)
+        offsets = {}
+        for idx, offset, info in cls.__scan(path):
+            offsets[info[0].lower()] = offset
+
+        # Store the offsets using the hash of the file, which is read in chunks
+        Cache.store(path, cls.OFFSETS_ENDING, offsets, None, stat, Cache.digest_file(path))
+
+        return offsets
+
+
+
+    ############################################################
+
+    # Scans through the lines of a memory-mapped file
+    # Compressed files are decompressed as they are read, with the offsets in the decompressed data
+    # Yields the line index, the byte offset and the information of each argument line
+    @classmethod
+    def __scan (cls, path):
+        encoding = cls.encoding()
+
+        kind = Compression.kind(path)
+        if kind is not None:
+            with open(path, "rb") as file:
+                with Compression.reader(file, kind) as stream:
+                    offset = 0
+                    for idx, line in enumerate(stream):
+                        try:
+                            info = cls.parse_line(line.decode(encoding))
+                        except:
+                            raise Exception("Failed to Parse parameter file.")
+                        if info is not None:
+                            yield idx, offset, info
+                        offset += len(line)
+            return
+
+        with open(path, "rb") as file:
+
+            # Empty files cannot be memory-mapped
+            if os.fstat(file.fileno()).st_size == 0:
+                return
+
+            with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                idx = 0
+                offset = 0
+                size = len(mm)
+
+                # Read each line
+                while offset < size:
+                    end = mm.find(b"\n", offset)
+                    if end < 0:
+                        end = size
+
+                    # Parse the line
+                    try:
+                        info = cls.parse_line(mm[offset:end].decode(encoding))
+                    except:
+                        raise Exception("Failed to Parse parameter file.")
+                    if info is not None:
+                        yield idx, offset, info
+
+                    idx += 1
+                    offset = end + 1
+
+
+
+    ############################################################
+
+    # Returns the text encoding used for reading parameter files
+    @staticmethod
+    def encoding () -> str:
+        return locale.getpreferredencoding(False)
 
 
 
     ############################################################
 
     # Writes to the file with the current arguments
-    def write_file (self, file = None):
+    # Only the lines of the arguments that have changed are rewritten, unless forced
+    # The file is locked while writing, and any changes made to the file by other
+    # processes are read first, so that only the changed values are written over them
+    # While waiting for the lock, the changes are posted for the process holding the lock,
+    # which writes the changes of every waiting process at once. A waiter whose changes are
+    # then already in the file does not write the file again
+    # In journal mode, the changes are appended to the journal instead of writing the file
+    # Takes in the file to write (the current file by default), whether to write all
+    # of the arguments and the number of seconds to wait for the lock
+    # Returns whether the file was written, which may have been by another process
+    def write_file (self, file = None, force = False, timeout = None) -> bool:
+        with self.lock:
+
+            # Check for empty file
+            own = file == None
+            if own:
+                file = self.path
+
+            # Append the changes to the journal
+            if own and not force and self.journal.enabled:
+                return self.__append(timeout)
+
+            # Check if there is anything to write before locking the file
+            if not force and not self.dirty:
+                return False
+
+            # Post the changes for the process holding the lock
+            handoff = own and not force
+            if handoff:
+                self.pending.append(dict([(key, self.args[key].value) for key in self.dirty_keys]), sync = False)
+
+            with FileLock(file, self.LOCK_TIMEOUT if timeout is None else timeout):
+
+                # Merge the changes from other processes, including any journaled changes
+                # The file is not written if another process has already written the changes
+                if handoff:
+                    self.__merge()
+                    if not self.dirty and self.journal.size() == 0:
+                        self.stats.count("handoffs")
+                        return True
+                    self.__unpend()
+                if own:
+                    self.__unjournal()
+
+                written = self.__write(file, force, own)
+
+                # The journaled and posted values are now in the file
+                if own:
+                    self.journal.remove()
+                    self.journaled = set()
+                if handoff:
+                    self.pending.remove()
+                return written
+
+
+
+    ############################################################
+
+    # Writes the values in the journal into the file and removes the journal
+    # Returns whether the file was written
+    def compact (self, timeout = None) -> bool:
+        with self.lock:
+            if not self.journaled and self.journal.size() == 0:
+                return False
+
+            with FileLock(self.path, self.LOCK_TIMEOUT if timeout is None else timeout):
+                self.__merge()
+                self.__unjournal()
+                with self.stats.phase("compact"):
+                    written = self.__write(self.path, False, True)
+                self.journal.remove()
+                self.journaled = set()
+                return written
+
+
+
+    ############################################################
 
-        # Check for empty file
-        if file == None:
-            file = self.path
+    # Writes the changed arguments, or all of the arguments if forced, into a file
+    # The lock of the file must be held
+    # Returns whether the file was written
+    def __write (self, file, force, own) -> bool:
+
+        # Find the changed arguments
+        keys = set(self.args.keys()) if force else self.dirty_keys
+        if len(keys) == 0:
+            return False
 
         # Opens up the current data and create an array of the lines
-        filedata = open(file, 'r').readlines()
+        kind = Compression.kind(file)
+        if kind is not None:
+            with open(file, "rb") as f:
+                filedata = io.TextIOWrapper(Compression.reader(f, kind)).readlines()
+        else:
+            with open(file, 'r') as f:
+                filedata = f.readlines()
 
         # Create the list of data
         data = {}
-        for d in self.args.keys():
+        for d in keys:
             data[d] = self.args[d].information
 
-        # Find the length of each column
-        lengths = [0] * len(data[d])
+        # Increase the length of each column if needed
+        resized = False
         for d in data.values():
             for idx, c in enumerate(d):
-                if len(c) > lengths[idx]:
-                    lengths[idx] = len(c)
-        
+                if len(c) > self.widths[idx]:
+                    self.widths[idx] = len(c)
+                    resized = True
+
+        # All lines must be aligned again if the columns changed size
+        if resized:
+            for d in self.args.keys():
+                if d not in data:
+                    data[d] = self.args[d].information
+
         # Format the line
         for line in self.lines.keys():
-            arg = self.args[self.lines[line]]
+            key = self.lines[line]
+            if key not in data:
+                continue
 
-            new_line = ""
-            for i in range(0, len(lengths)):
-                new_line += arg.information[i] + (" " * (lengths[i] - len(arg.information[i]) + 1)) + "| "
-
-            # Remove the final |
-            new_line = new_line[:-2] + "\n"
+            new_line = self.format_line(data[key])
 
             # Check if this line is missing (for new files)
             if line >= len(filedata):
@@ -166,10 +777,168 @@ class ParamFile:
             else:
                 filedata[line] = new_line
 
+            # Keep the text of the line for reloading the file
+            if own:
+                self.text[line] = new_line.strip()
+
         # Write the lines to the ouput file
-        out = open(file, 'w')
-        out.writelines(filedata)
-        out.close()
+        with self.stats.phase("write_file"):
+            if kind is not None:
+                Cache.atomic_write(file, Compression.compress("".join(filedata).encode(self.encoding()), kind), "wb")
+            else:
+                Cache.atomic_write(file, filedata)
+        if self.stats.enabled:
+            self.stats.count("bytes_written", sum([len(l) for l in filedata]))
+
+        # The arguments are now saved, unless they were written to another file
+        if own:
+            for d in keys:
+                self.args[d].dirty = False
+
+            # Store the state of the written file
+            stat = os.stat(file)
+            self.disk = (stat.st_size, stat.st_mtime_ns)
+
+        return True
+
+
+
+    ############################################################
+
+    # Writes the changed arguments to the file from a thread, without blocking the event loop
+    # Takes in the same arguments as write_file
+    # Returns whether the file was written
+    async def awrite (self, file = None, force = False, timeout = None) -> bool:
+
+        # Asyncio is slow to import, so it is only imported when needed
+        import asyncio
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, functools.partial(self.write_file, file, force, timeout))
+
+
+
+    ############################################################
+
+    # Appends the changed values to the journal
+    # The journal is compacted into the file in the background once it passes the limit
+    # Returns whether any values were saved
+    def __append (self, timeout) -> bool:
+        keys = self.dirty_keys
+        if len(keys) == 0:
+            return False
+
+        # Write the line of changed values
+        with FileLock(self.path, self.LOCK_TIMEOUT if timeout is None else timeout):
+            with self.stats.phase("write_journal"):
+                self.journal.append(dict([(key, self.args[key].value) for key in keys]))
+        self.stats.count("journal_appends")
+
+        # The values are now saved
+        for key in keys:
+            self.args[key].dirty = False
+        self.journaled |= keys
+
+        # Compact the journal in the background, if it is not already being compacted
+        if self.journal.full() and (self.compactor is None or not self.compactor.is_alive()):
+            self.compactor = threading.Thread(target=self.compact, name="params-compactor", daemon=True)
+            self.compactor.start()
+        return True
+
+
+
+    ############################################################
+
+    # Applies the values in the journal on top of the arguments read from the file
+    # The changed arguments are copied, so the arguments passed in are never changed
+    # Returns the dictionary of arguments with the journaled values
+    def __journaled (self, args) -> dict:
+        values = self.journal.read()
+        self.journaled = set([key for key in values.keys() if key in args])
+        if len(self.journaled) == 0:
+            return args
+
+        args = dict(args)
+        for key in self.journaled:
+            arg = args[key].copy()
+            arg.value = values[key]
+            arg.dirty = False
+            args[key] = arg
+        return args
+
+
+
+    ############################################################
+
+    # Applies the changes posted by the processes waiting for the lock, so they are written at once
+    # The later changes of each key are used, and the lock of the file must be held
+    def __unpend (self):
+        values = self.pending.read()
+        self.update(dict([(k, v) for k, v in values.items() if k in self.args]))
+
+
+
+    ############################################################
+
+    # Applies the values in the journal and marks them to be written into the file
+    # The lock of the file must be held
+    def __unjournal (self):
+        values = self.journal.read()
+        values = dict([(k, v) for k, v in values.items() if k in self.args])
+        self.update(values)
+        for key in set(values.keys()) | self.journaled:
+            if key in self.args:
+                self.args[key].dirty = True
+
+
+
+    ############################################################
+
+    # Reads the changes made to the file by other processes and applies the
+    # changed values on top of them
+    # Values that the file already has are no longer changed, so they are not written again
+    def __merge (self):
+
+        # Check if the file has changed since it was last read or written
+        stat = os.stat(self.path)
+        if (stat.st_size, stat.st_mtime_ns) == self.disk:
+            return
+
+        # Read the file, which applies the changed values again
+        self.reload()
+
+
+
+    ############################################################
+
+    # Returns the set of keys that have been changed since being read or written
+    @property
+    def dirty_keys (self) -> set:
+        return set([key for key, arg in self.args.items() if arg.dirty])
+
+
+
+    ############################################################
+
+    # Checks if any arguments have changed since being read or written
+    @property
+    def dirty (self) -> bool:
+        for arg in self.args.values():
+            if arg.dirty:
+                return True
+        return False
+
+
+
+    ############################################################
+
+    # Formats the information of an argument into a line of the file
+    def format_line (self, information) -> str:
+        new_line = ""
+        for i in range(0, len(self.widths)):
+            new_line += information[i] + (" " * (self.widths[i] - len(information[i]) + 1)) + "| "
+
+        # Remove the final |
+        return new_line[:-2] + "\n"
 
 
 
@@ -185,6 +954,8 @@ class ParamFile:
         # Reset the arguments
         self.args = {}
         self.lines = {}
+        self.widths = [0] * 5
+        self.text = {}
             
         # Count the lines
         line = 1
@@ -216,7 +987,7 @@ class ParamFile:
             f.write("# New parameter file with some default parameters\n")
 
         # Write to a new file
-        self.write_file(file)
+        self.write_file(file, force = True)
 
         # Print the parameter file update
         print("\n%sCreated a new parameter file %s%s%s. Please edit all parameters before continuing." % (Color.END, Color.PARAM, file, Color.END))
@@ -224,6 +995,94 @@ class ParamFile:
 
 
 
+    ############################################################
+
+    # Checks if the prompts are disabled from the environment
+    @staticmethod
+    def is_headless () -> bool:
+        return os.environ.get(ParamFile.HEADLESS_ENV, "").lower() in ("1", "t", "true", "y", "yes")
+
+
+
+    ############################################################
+
+    # Sets the value of an argument and tells the listeners if it has changed
+    # Returns whether the value was changed
+    def set (self, key, value) -> bool:
+        return key in self.update({key: value})
+
+
+
+    ############################################################
+
+    # Sets the values of several arguments at once
+    # The changed arguments are copied and swapped in with a single new dictionary,
+    # so readers see either all or none of the changes
+    # Takes in a dictionary of keys and values
+    # Returns the set of keys that have changed
+    def update (self, values) -> set:
+        with self.lock:
+            args = None
+            keys = set()
+
+            for key, value in values.items():
+                old = self.args[key]
+                if type(value) is type(old.value) and value == old.value:
+                    continue
+
+                # Create the changed argument
+                arg = old.copy()
+                arg.value = value
+
+                # Create the new dictionary on the first change
+                if args is None:
+                    args = dict(self.args)
+                args[key] = arg
+                keys.add(key)
+
+            # Swap in the new arguments
+            if len(keys) > 0:
+                self.args = args
+                self.version += 1
+                self.notify(keys)
+            return keys
+
+
+
+    ############################################################
+
+    # Collects changes and applies them as a single update when the block ends
+    # The file is written once with all of the changes, unless save is False
+    # Other writers wait until the block has ended
+    # Yields a dictionary that the new values are added to
+    @contextmanager
+    def transaction (self, save = True):
+        with self.lock:
+            values = {}
+            yield values
+            self.update(values)
+            if save:
+                self.write_file()
+
+
+
+    ############################################################
+
+    # Adds a function that is called with the set of changed keys whenever values change
+    def subscribe (self, callback):
+        self.listeners.append(callback)
+
+
+
+    ############################################################
+
+    # Tells all listeners that some keys have changed
+    def notify (self, keys):
+        for callback in list(self.listeners):
+            callback(keys)
+
+
+
     ############################################################
 
     # Checks if argument exists
@@ -0,0 +1,107 @@
+import bisect
+import fnmatch
+import re
+
+# Class that stores the keys of the parameters in order, so that the keys with a prefix
+# can be found without reading every key
+# Dotted keys (such as solver.tolerance) form sections, where each dot starts a new level
+class KeyIndex:
+
+
+    ############################################################
+    # DEFINED CONSTANTS
+
+    # The characters that start a wildcard within a glob pattern
+    WILDCARDS = re.compile(r"[*?\[]")
+
+
+
+    ############################################################
+
+    # Constructor for the index
+    # Takes in the keys of the parameters
+    def __init__ (self, keys):
+        self.keys = sorted(keys)
+
+
+
+    ############################################################
+
+    # Returns the keys that start with a prefix, in order
+    # The time taken depends on the number of keys found rather than the number of keys
+    def prefix (self, prefix) -> list:
+        if prefix == "":
+            return list(self.keys)
+        start = bisect.bisect_left(self.keys, prefix)
+        end = bisect.bisect_left(self.keys, prefix[:-1] + chr(ord(prefix[-1]) + 1), start)
+        return self.keys[start:end]
+
+
+
+    ############################################################
+
+    # Returns the keys within a section, such as "solver" for all of the "solver." keys
+    def section (self, name) -> list:
+        name = name.strip(".")
+        return self.prefix(name + "." if name != "" else "")
+
+
+
+    ############################################################
+
+    # Returns the names of the sections and keys directly within a section
+    def children (self, name = "") -> list:
+        name = name.strip(".")
+        start = len(name) + 1 if name != "" else 0
+        children = []
+        for key in self.section(name):
+            child = key[start:].split(".", 1)[0]
+            if len(children) == 0 or children[-1] != child:
+                children.append(child)
+        return children
+
+
+
+    ############################################################
+
+    # Returns the keys that match a glob pattern, such as "net.*.size"
+    # Only the keys that start with the text before the first wildcard are checked
+    def glob (self, pattern) -> list:
+        wildcard = self.WILDCARDS.search(pattern)
+        if wildcard is None:
+            return [pattern] if pattern in self else []
+
+        match = re.compile(fnmatch.translate(pattern)).match
+        return [key for key in self.prefix(pattern[:wildcard.start()]) if match(key)]
+
+
+
+    ############################################################
+
+    # Returns the keys for a filter, which is a glob pattern if it has a wildcard,
+    # otherwise a prefix of the keys
+    def filter (self, pattern) -> list:
+        if self.WILDCARDS.search(pattern) is not None:
+            return self.glob(pattern)
+        return self.prefix(pattern)
+
+
+
+    ############################################################
+
+    # Returns whether a key exists
+    def __contains__ (self, key):
+        position = bisect.bisect_left(self.keys, key)
+        return position < len(self.keys) and self.keys[position] == key
+
+
+
+    ############################################################
+
+    # Returns the number of keys
+    def __len__ (self):
+        return len(self.keys)
+
+
+
+    ############################################################
@@ -0,0 +1,106 @@
+import os
+import json
+
+# Class that records changed values in a journal next to a parameter file
+# Each save appends a single line with the changed values, rather than writing the whole file
+# The values in the journal are applied on top of the file when it is read, until the
+# journal is compacted back into the file
+class Journal:
+
+
+    ############################################################
+    # DEFINED CONSTANTS
+
+    # The number of bytes the journal can reach before it is compacted into the file
+    LIMIT = 64 * 1024
+
+
+
+    ############################################################
+
+    # Constructor for the journal
+    # Takes in the path of the parameter file, the number of bytes before compacting,
+    # which is True for the default limit, or None or False if changes are not journaled,
+    # and the ending of the journal file
+    def __init__ (self, path, limit = None, ending = ".journal"):
+        directory, name = os.path.split(os.path.abspath(path))
+        self.path = os.path.join(directory, "." + name + ending)
+        if limit is True:
+            limit = self.LIMIT
+        self.limit = int(limit) if limit not in (None, False) else None
+
+
+
+    ############################################################
+
+    # Returns whether changes are saved to the journal
+    @property
+    def enabled (self) -> bool:
+        return self.limit is not None
+
+
+
+    ############################################################
+
+    # Returns the dictionary of values in the journal, with the later values for each key
+    # Lines that are incomplete, such as from a write that was interrupted, are ignored
+    def read (self) -> dict:
+        values = {}
+        try:
+            with open(self.path, "r", encoding="utf-8") as file:
+                for line in file:
+                    try:
+                        values.update(json.loads(line))
+                    except ValueError:
+                        continue
+        except FileNotFoundError:
+            pass
+        return values
+
+
+
+    ############################################################
+
+    # Appends a line with a dictionary of changed values to the journal
+    # The line is synced to the disk unless sync is False
+    def append (self, values: dict, sync = True):
+        line = json.dumps(values, separators=(",", ":"), default=str) + "\n"
+        with open(self.path, "a", encoding="utf-8") as file:
+            file.write(line)
+            if sync:
+                file.flush()
+                os.fsync(file.fileno())
+
+
+
+    ############################################################
+
+    # Returns the size of the journal in bytes
+    def size (self) -> int:
+        try:
+            return os.path.getsize(self.path)
+        except OSError:
+            return 0
+
+
+
+    ############################################################
+
+    # Returns whether the journal has passed the limit and should be compacted
+    def full (self) -> bool:
+        return self.enabled and self.size() >= self.limit
+
+
+
+    ############################################################
+
+    # Removes the journal, once its values have been written into the file
+    def remove (self):
+        try:
+            os.remove(self.path)
+        except FileNotFoundError:
+            pass
+
+
+
+    ############################################################
@@ -0,0 +1,246 @@
+import os
+import json
+from fnmatch import fnmatch
+from .cache import Cache
+from .stats import Stats
+
+# Class that locates parameter files within a set of search roots
+# A persistent index of the directories is kept so that repeated searches
+# only need to check the modification times of the directories they use
+class Locator:
+
+
+    ############################################################
+    # DEFINED CONSTANTS
+
+    # The default directory patterns that are never searched
+    EXCLUDES = (".git", ".hg", ".svn", "__pycache__", ".venv", "venv", "node_modules",
+                ".tox", ".nox", ".mypy_cache", ".pytest_cache", "*.egg-info")
+
+    # The file patterns that are stored in the index, including the compressed files
+    PATTERNS = ("*.para", "*.para.gz", "*.para.xz", "*.para.zst")
+
+    # The ending of the index file within the cache
+    INDEX_ENDING = ".index"
+    INDEX_VERSION = 1
+
+
+
+    ############################################################
+
+    # Constructor for the locator
+    # Takes in a list of search roots, a list of excluded patterns, whether to use the index
+    # and the statistics to record to (optional)
+    # Roots and excludes may also be a comma separated string
+    def __init__ (self, roots = ".", excludes = None, index = True, stats = None):
+        self.roots = [r.rstrip("/") or "/" for r in self.__split(roots)] or ["."]
+        self.excludes = self.__split(excludes) if excludes is not None else list(self.EXCLUDES)
+        self.index = index
+        self.stats = stats if stats is not None else Stats(False)
+
+        # The loaded directory entries and the number of directories listed
+        self.dirs = None
+        self.modified = False
+        self.scans = 0
+
+
+
+    ############################################################
+
+    # Finds the first file matching the name within the search roots
+    # The name may be a list of names, where the earlier names are used first within a directory
+    # Returns a 'str' with the path to the file or None if no file is found
+    def find (self, name) -> str:
+        names = [name] if isinstance(name, str) else list(name)
+
+        # Load the index if it has not been loaded
+        if self.dirs is None:
+            self.__load()
+
+        # Walk through the directories, stopping at the first match
+        # The indexed listing of each unchanged directory is used, so only changed directories are
+        # listed. Every directory before the match is checked, so a new file earlier in the walk
+        # is always found before an indexed file later in the walk
+        found = None
+        scans = self.scans
+        for root in self.roots:
+            for subdir, files in self.__walk(root):
+                for name in names:
+                    if name in files:
+                        found = subdir + "/" + name
+                        break
+                if found:
+                    break
+            if found:
+                break
+        self.stats.count("index_hits" if found and self.scans == scans else "index_misses")
+
+        # Store the updated index
+        self.__save()
+        return found
+
+
+
+    ############################################################
+
+    # Checks if a directory name is excluded from the search
+    def excluded (self, name) -> bool:
+        for pattern in self.excludes:
+            if fnmatch(name, pattern):
+                return True
+        return False
+
+
+
+    ############################################################
+
+    # Walks through a root directory in the same order as os.walk
+    # Directories that have not been modified since the last walk are not listed again
+    # Yields the directory and the list of indexed files within it
+    def __walk (self, root):
+        stack = [root]
+
+        while len(stack) > 0:
+            subdir = stack.pop()
+
+            # Skip any directories that can no longer be read
+            mtime = self.__mtime(subdir)
+            if mtime is None:
+                continue
+
+            # Use the previous listing if the directory is unchanged
+            entry = self.dirs.get(subdir)
+            if entry is None or entry[0] != mtime:
+                entry = self.__scan(subdir, mtime)
+
+            yield subdir, entry[2]
+
+            # Add the sub-directories in reverse to keep the walk order
+            for d in reversed(entry[1]):
+                stack.append(subdir + "/" + d)
+
+
+
+    ############################################################
+
+    # Lists a directory and updates the index entry for it
+    # Returns the entry of [mtime, directories, files]
+    def __scan (self, subdir, mtime) -> list:
+        dirs = []
+        files = []
+
+        # Read the directory
+        scanned = 0
+        try:
+            with os.scandir(subdir) as it:
+                for e in it:
+                    scanned += 1
+                    try:
+                        if e.is_dir(follow_symlinks=False):
+                            if not self.excluded(e.name):
+                                dirs.append(e.name)
+                        elif self.__indexed(e.name):
+                            files.append(e.name)
+                    except OSError:
+                        continue
+        except OSError:
+            pass
+
+        self.stats.count("dirs_scanned")
+        self.stats.count("files_scanned", scanned)
+
+        # Replace the entry
+        entry = [mtime, dirs, files]
+        self.dirs[subdir] = entry
+        self.scans += 1
+        self.modified = True
+
+        return entry
+
+
+
+    ############################################################
+
+    # Checks if a file name should be stored in the index
+    def __indexed (self, name) -> bool:
+        for pattern in self.PATTERNS:
+            if fnmatch(name, pattern):
+                return True
+        return False
+
+
+
+    ############################################################
+
+    # Returns the modification time of a directory or None if it is missing
+    @staticmethod
+    def __mtime (path):
+        try:
+            return os.stat(path).st_mtime_ns
+        except OSError:
+            return None
+
+
+
+    ############################################################
+
+    # Returns the path of the index file for the current roots and excludes
+    @property
+    def index_path (self) -> str:
+        key = "|".join([os.path.abspath(r) for r in self.roots] + sorted(self.excludes) + list(self.PATTERNS))
+        return Cache.path(key, self.INDEX_ENDING)
+
+
+
+    ############################################################
+
+    # Loads the index from the cache if it exists
+    def __load (self):
+        self.dirs = {}
+        self.modified = False
+
+        # Check if using the index
+        if not self.index:
+            return
+
+        # Attempt to read the index, ignoring any invalid indexes
+        try:
+            with open(self.index_path) as file:
+                data = json.load(file)
+            if data.get("version") == self.INDEX_VERSION:
+                self.dirs = data["dirs"]
+        except (OSError, ValueError, KeyError):
+            self.dirs = {}
+
+
+
+    ############################################################
+
+    # Saves the index to the cache if it has changed
+    def __save (self):
+        if not self.index or not self.modified:
+            return
+
+        # Failing to store the index should never stop the search
+        try:
+            Cache.atomic_write(self.index_path, json.dumps({"version": self.INDEX_VERSION, "dirs": self.dirs}))
+            self.modified = False
+        except OSError:
+            pass
+
+
+
+    ############################################################
+
+    # Splits a comma separated string into a list
+    @staticmethod
+    def __split (value) -> list:
+        if value is None or value is True:
+            return []
+        if isinstance(value, str):
+            return [v.strip() for v in value.split(",") if v.strip() != ""]
+        return list(value)
+
+
+
+    ############################################################
@@ -0,0 +1,134 @@
+import os
+import time
+import threading
+
+# Advisory file locks are only available on POSIX systems
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+# Class that holds an advisory lock for a file across processes
+# The lock is held on a hidden lock file next to the file, as files are replaced when written
+# The lock of the open lock file (flock) excludes other open files, even within this process,
+# and a thread lock for each file also excludes the other locks within this process, as
+# network file systems may lock whole processes instead
+# On systems without fcntl only the locks within this process are excluded
+class FileLock:
+
+
+    ############################################################
+    # DEFINED CONSTANTS
+
+    # The thread lock for each lock file within this process
+    THREADS = {}
+
+    # The lock for creating the thread locks
+    GUARD = threading.Lock()
+
+
+
+    ############################################################
+
+    # Constructor for the lock
+    # Takes in the path of the file to lock, the number of seconds to wait for the lock
+    # and the number of seconds between attempts
+    # Links are followed, so every link to a file shares the lock of the file
+    def __init__ (self, path, timeout = 10.0, interval = 0.01):
+        directory, name = os.path.split(os.path.realpath(path))
+        self.path = os.path.join(directory, "." + name + ".lock")
+        self.timeout = timeout
+        self.interval = interval
+        self.file = None
+        self.thread = None
+
+
+
+    ############################################################
+
+    # Acquires the lock, waiting until the timeout
+    # Raises a TimeoutError if the lock could not be acquired
+    def acquire (self):
+        end = time.monotonic() + self.timeout
+
+        # Exclude the other locks within this process first
+        with FileLock.GUARD:
+            thread = FileLock.THREADS.setdefault(self.path, threading.Lock())
+        if not thread.acquire(timeout = max(0, self.timeout)):
+            raise TimeoutError("Timed out waiting for the lock on '%s'." % self.path)
+        self.thread = thread
+
+        if fcntl is None:
+            return
+
+        # Attempt to get the lock until the timeout
+        try:
+            self.file = open(self.path, "a+")
+            while True:
+                try:
+                    fcntl.flock(self.file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                    return
+                except OSError:
+                    if time.monotonic() >= end:
+                        raise TimeoutError("Timed out waiting for the lock on '%s'." % self.path)
+                    time.sleep(self.interval)
+        except BaseException:
+            if self.file is not None:
+                self.file.close()
+                self.file = None
+            self.thread = None
+            thread.release()
+            raise
+
+
+
+    ############################################################
+
+    # Releases the lock
+    def release (self):
+        if self.file is not None:
+            fcntl.flock(self.file, fcntl.LOCK_UN)
+            self.file.close()
+            self.file = None
+
+        if self.thread is not None:
+            thread, self.thread = self.thread, None
+            thread.release()
+
+
+
+    ############################################################
+
+    # Acquires the lock at the start of a with block
+    def __enter__ (self):
+        self.acquire()
+        return self
+
+
+
+    ############################################################
+
+    # Releases the lock at the end of a with block
+    def __exit__ (self, *args):
+        self.release()
+
+
+
+    ############################################################
+
+    # Removes the thread locks in a forked process, as any lock held by another thread at the
+    # time of the fork would never be released
+    @staticmethod
+    def reset ():
+        FileLock.THREADS = {}
+        FileLock.GUARD = threading.Lock()
+
+
+
+    ############################################################
+
+
+
+# The forked processes start without any of the thread locks
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=FileLock.reset)
@@ -1,10 +1,25 @@
 #!/usr/bin/python3
 
 # Import relevant modules
+import re
 import sys
+import time
+import atexit
+import functools
+import warnings
+from types import MappingProxyType
 from .color import Color
 from .argument import Arg
 from .file import ParamFile
+from .locator import Locator
+from .stack import ParamStack
+from .watch import Watcher
+from .stats import Stats
+from .record import Record
+from .index import KeyIndex
+from .sweep import Sweep
+from .shared import SharedParams
+from .provenance import Provenance
 
 
 
@@ -13,6 +28,19 @@ from .file import ParamFile
 class Params:
 
 
+    ############################################################
+    # DEFINED CONSTANTS
+
+    # The loads that are running for each event loop and set of arguments
+    # Concurrent loads with the same arguments share the same parameters
+    LOADING = {}
+
+    # The commands that set the options of the parameters, rather than being parameters
+    OPTIONS = ("para", "list", "edit", "save", "watch", "lazy", "stats", "headless", "cache", "roots",
+        "exclude", "journal", "shared", "server", "validate", "provenance")
+
+
+
     ############################################################
 
     '''
@@ -28,24 +56,135 @@ class Params:
         self.name = args[0] if len(args) > 0 else "script.py"
 
         # Load the commands
+        start = time.perf_counter()
         self.commands = self.__parse(args[1:]) if len(args) > 1 else {}
+        parsed = time.perf_counter() - start
 
         # Update the commands with the kwargs
         for k in kwargs.keys():
             self.commands[k.lower()] = kwargs[k]
 
+        # Record the statistics if enabled, which may be a hook function for each record
+        hook = self.commands.get("stats")
+        self._stats = Stats(callable(hook) or Arg.convert(hook) == True, hook if callable(hook) else None)
+        self._stats.time("parse_argv", parsed)
+
+        # Count the lookups only when enabled, so there is no cost otherwise
+        if self._stats.enabled:
+            self.get = self.__counted_get
+
         # Get the parameter file to look for
         self.paramfile = self.commands["para"] if "para" in self.commands.keys() else self.name.replace(".py", ".para")
 
-        # Read the parameters file
-        self.reader = ParamFile(self.paramfile)
+        # Create the typed values of the commands, which override the file values
+        self._overrides = {}
+        for k in self.commands.keys():
+            self._overrides[k] = Arg.convert(self.commands[k])
+
+        # The table of typed values, which contains the file values once the file is read
+        self._values = dict(self._overrides)
+        self._merged = False
+
+        # The cached arrays and dictionary of all values, which are replaced
+        # whenever the generation of the values changes
+        self._arrays = {}
+        self._all = None
+        self._struct = None
+        self._index = None
+        self._generation = 0
+
+        # Check if the parameter file should only be read when first needed
+        self.lazy = Arg.convert(self.commands.get("lazy", False)) == True
+        self._reader = None
+
+        # The watcher of the file, which is started once the file is read
+        self.watcher = None
+        interactive = "list" in self.commands or "edit" in self.commands or "save" in self.commands
+
+        # Read the values published in shared memory by another process, if they are current
+        self.shared = Arg.convert(self.commands.get("shared", False)) == True
+        self._shared = None
+        self._published = None
+        if self.shared and not interactive:
+            self._shared = SharedParams.attach(self.__shared_name())
+
+        # Read the values from a parameter server, if one is given and can be reached
+        self._remote = None
+        if "server" in self.commands and self._shared is None and not interactive:
+            from .server import ParamClient
+            self._remote = ParamClient.fetch(self.commands["server"], self.__files(),
+                self.commands.get("roots", "."), self.commands.get("exclude"))
+            if self._remote is not None:
+                values = dict(self._remote)
+                values.update(self._overrides)
+                self._values = values
+                self._merged = True
+
+        # Read the file straight away unless lazy, shared or served, or if a command needs the file
+        if not self.lazy and self._shared is None and self._remote is None or interactive:
+            self.__load()
+
+        # Record the effective values of this run, if a provenance log is given
+        if "provenance" in self.commands and Arg.convert(self.commands["provenance"]) != False:
+            path = self.commands["provenance"]
+            self.record(path if isinstance(path, str) and Arg.convert(path) != True else Provenance.PATH)
+
+
+
+    ############################################################
+
+    '''
+    Returns the parameter file reader, reading the file if it has not been read
+    @returns                The parameter file
+    '''
+    @property
+    def reader (self) -> ParamFile:
+        if self._reader is None:
+            self.__load()
+        return self._reader
+
+
+
+    ############################################################
+
+    '''
+    Locates and reads the parameter file and handles the file commands
+    '''
+    def __load (self):
+        with self._stats.phase("load"):
+            self.__read()
+
+
+
+    ############################################################
+
+    '''
+    Reads the parameter file and handles the file commands
+    '''
+    def __read (self):
+
+        # Create the locator from the search roots and excluded directories
+        locator = Locator(self.commands.get("roots", "."), self.commands.get("exclude"), stats = self._stats)
+
+        # Get the list of files, which may be a comma separated stack of files
+        files = self.__files()
+        headless = Arg.convert(self.commands["headless"]) == True if "headless" in self.commands else None
+        cache = Arg.convert(self.commands.get("cache", True)) != False
+        journal = self._overrides.get("journal")
+
+        # Read the parameters file, or the stack of files with the later files on top
+        if len(files) == 1:
+            self._reader = ParamFile(files[0], locator, headless, cache, self._stats, journal)
+        else:
+            self._reader = ParamStack(files, locator, headless, cache, self._stats, journal)
 
         # If listing the file
         if "list" in self.commands.keys():
             self.__list()
 
         # If editing the file, edit the commands
-        if "edit" in self.commands.keys():
+        # The file is never edited when running headless, as that would wait for input
+        if "edit" in self.commands.keys() and not self.reader.headless:
             self.__edit(self.commands["edit"])
 
         # If saving the file to the system, save all the changes
@@ -53,11 +192,158 @@ class Params:
             for com in self.commands.keys():
                 # If the command exists, update the value to the one in the commands
                 if self.reader.exists(com):
-                    self.reader.args[com].value = Arg.convert(self.commands[com])
+                    self.reader.set(com, self._overrides[com])
 
         # Update the write file
         self.reader.write_file()
 
+        # Update the cached values whenever the file values change
+        self.reader.subscribe(self.__changed)
+
+        # Check all of the values at once, if requested
+        if "validate" in self.commands and Arg.convert(self.commands["validate"]) == True:
+            self.validate_all()
+
+        # Reload the file whenever it changes, checking at least every 'watch' seconds
+        self.watcher = None
+        if "watch" in self.commands and Arg.convert(self.commands["watch"]) != False:
+            interval = self._overrides["watch"]
+            self.watcher = Watcher(self.reader, interval = interval if type(interval) in (int, float) else 1.0).start()
+
+        # Any later changes are saved when the script exits
+        if self.lazy:
+            atexit.register(self.reader.write_file)
+
+        # Publish the values for the other processes, unless they were already published
+        # The file values are used from now on, as they include any changes
+        if self.shared:
+            if self._shared is None:
+                self._published = SharedParams.publish(self.__shared_name(), self.reader)
+            else:
+                # Remove the tables made from the shared values, as the file may have changed since
+                self._index = None
+                self._generation += 1
+                self._arrays = {}
+            self._shared = None
+
+
+
+    ############################################################
+
+    '''
+    Removes the values published in shared memory, so the next process reads the file again
+    @returns                Whether the published values were removed
+    '''
+    def unpublish (self) -> bool:
+        self._published = None
+        return SharedParams.remove(self.__shared_name())
+
+
+
+    ############################################################
+
+    '''
+    Records the effective values of this run in a provenance log, which are the file values
+    with the command line values over them. The commands that only set the options of the
+    parameters are left out, unless the file has a parameter with the same key. The run is
+    buffered and written in a batch, at the latest when the script exits.
+    @param  path: str       The path of the log
+    '''
+    def record (self, path: str = Provenance.PATH):
+
+        # Read the values from the shared memory, if the file has not been read
+        shared = self._shared
+        if shared is not None:
+            values = dict(shared.items())
+        else:
+            values = dict(self.get_all())
+        for key, value in self._overrides.items():
+            if key in values or key not in Params.OPTIONS:
+                values[key] = value
+
+        Provenance.open(path).record(values, self.name, sys.argv[1:], self.__files())
+
+
+
+    ############################################################
+
+    '''
+    Returns the list of parameter files, which may be a comma separated stack of files
+    @returns                The list of files from the base file to the top file
+    '''
+    def __files (self) -> list:
+        files = self.paramfile
+        if isinstance(files, str):
+            files = [f.strip() for f in files.split(",") if f.strip() != ""]
+        return list(files)
+
+
+
+    ############################################################
+
+    '''
+    Returns the name of the shared memory for the parameter files and search options
+    @returns                The name of the shared memory
+    '''
+    def __shared_name (self) -> str:
+        return SharedParams.name(self.__files(), self.commands.get("roots", "."), self.commands.get("exclude"))
+
+
+
+    ############################################################
+
+    '''
+    Creates the parameters from a thread, without blocking the event loop.
+    The parameters are always headless, so they never wait for input.
+    Concurrent loads with the same arguments share a single read of the file.
+    @param  kwargs          A list of additional arguments to parse
+    @returns                The parameters, once the file has been read
+    '''
+    @classmethod
+    async def aload (cls, **kwargs):
+        kwargs["headless"] = True
+
+        # Asyncio is slow to import, so it is only imported when needed
+        import asyncio
+        loop = asyncio.get_running_loop()
+
+        # Join any load with the same arguments that is already running
+        key = (id(loop), cls, tuple(sys.argv), repr(sorted(kwargs.items(), key=lambda item: item[0])))
+        future = Params.LOADING.get(key)
+        if future is None:
+            future = loop.run_in_executor(None, functools.partial(cls.__open, kwargs))
+            Params.LOADING[key] = future
+            future.add_done_callback(lambda f: Params.LOADING.pop(key, None))
+
+        # A cancelled caller does not cancel the load for the other callers
+        return await asyncio.shield(future)
+
+
+
+    ############################################################
+
+    '''
+    Creates the parameters and reads the file, even if the parameters are lazy
+    @param  kwargs: dict    The arguments to create the parameters with
+    @returns                The parameters
+    '''
+    @classmethod
+    def __open (cls, kwargs: dict):
+        params = cls(**kwargs)
+        params.reader
+        return params
+
+
+
+    ############################################################
+
+    '''
+    Writes the changed values to the file from a thread, without blocking the event loop
+    @returns                Whether the file was written
+    '''
+    async def awrite (self) -> bool:
+        return await self.reader.awrite()
+
 
 
     ############################################################
@@ -76,16 +362,12 @@ class Params:
 
         # Pass the lower case version
         key = key.lower()
-        arg = None
 
-        # Checks if the commands have the argument (use this one instead)
-        if key in self.commands.keys():
-            arg = Arg.convert(self.commands[key])
-
-        # Read the argument value from file reader if it exists
-        else:
-            if self.reader.exists(key):
-                arg = self.reader.arg(key)()
+        # Read the typed value, which uses the command value over the file value
+        try:
+            arg = self._values[key]
+        except KeyError:
+            arg = self.__lookup(key)
 
         # Returns the default value if missing
         if arg == None and default != None:
@@ -96,6 +378,110 @@ class Params:
 
 
 
+    ############################################################
+
+    '''
+    Returns the value of a parameter and counts the lookup. This is used in place of get
+    when the statistics are enabled.
+    @param  key: str        The key of the parameter to look for
+    @param  default         The default value if no key has been found
+    @returns                The value from the parameter (as an object)
+    '''
+    def __counted_get (self, key: str, default = None) -> object:
+        self._stats.count("lookups")
+        return Params.get(self, key, default)
+
+
+
+    ############################################################
+
+    '''
+    Returns the times spent in each phase and the counts of events, if the statistics are enabled
+    @returns                A dictionary of the "times" in seconds and the "counts"
+    '''
+    def stats (self) -> dict:
+        return self._stats.report()
+
+
+
+    ############################################################
+
+    '''
+    Returns the values of a list of parameters in a single call.
+    @param  keys: list      The keys of the parameters to look for
+    @param  default         The default value for any key that has not been found
+    @returns                The list of values in the same order as the keys
+    '''
+    def get_many (self, keys, default = None) -> list:
+        keys = [key.lower() for key in keys]
+        if "" in keys:
+            raise ValueError("Missing key input from .get_many function.")
+        self._stats.count("lookups", len(keys))
+
+        # The shared values are read one at a time
+        if self._shared is not None:
+            return [Params.get(self, key, default) for key in keys]
+
+        # Make sure the file values are in the table
+        if not self._merged:
+            self.__lookup("")
+
+        # Read each of the values from a single version of the table
+        values = self._values
+        missing = "" if default == None else default
+        result = []
+        for key in keys:
+            value = values.get(key)
+            result.append(missing if value == None else value)
+        return result
+
+
+
+    ############################################################
+
+    '''
+    Returns a frozen record of the file values, where each value is read as an attribute.
+    The fields are typed from the default value of each parameter, and keys that are not
+    valid Python names are left out. The record is shared between calls until a value changes.
+    @param  name: str       The name of the record class
+    @returns                The record of values
+    '''
+    def struct (self, name = "Config"):
+
+        # Check for the cached record
+        cached = self._struct
+        if cached is not None and cached[0] == self._generation and cached[1] == name:
+            return cached[2]
+
+        # Use a single version of the arguments, in case they change while reading
+        # The shared values are typed from the value, as the defaults are not shared
+        generation = self._generation
+        shared = self._shared
+        if shared is not None:
+            items = [(key, value, type(value)) for key, value in shared.items()]
+        else:
+            items = [(key, arg(), type(arg.default)) for key, arg in self.reader.args.items()]
+
+        # Find the type and value of each field, using the command values over the file values
+        fields = []
+        values = {}
+        for key, value, kind in items:
+            if not Record.valid(key):
+                continue
+            if key in self._overrides:
+                value = self._overrides[key]
+            if kind is float and type(value) is int:
+                value = float(value)
+            fields.append((key, kind))
+            values[key] = value
+
+        # Create the record from the compiled class
+        record = Record.create(Record.compile(name, fields), values)
+        self._struct = (generation, name, record)
+        return record
+
+
+
     ############################################################
 
     '''
@@ -108,6 +494,17 @@ class Params:
     '''
     def get_array (self, key: str, default = None, strings = False, delim = ',') -> list:
 
+        # Check for a cached array
+        # The cache is read before the value, so a changed value is never stored in the new cache
+        arrays = self._arrays
+        try:
+            cache = (key.lower(), default, strings, delim)
+            return list(arrays[cache])
+        except KeyError:
+            pass
+        except TypeError:
+            cache = None
+
         # Get the value
         value = self.get(key, default)
 
@@ -115,33 +512,314 @@ class Params:
         if not strings:
 
             # Returns the new list of values stripped of white space
-            return [Arg.convert(x.strip()) for x in str(value).split(delim)]
+            array = [Arg.convert(x.strip()) for x in str(value).split(delim)]
 
         # Otherwise return the casted type
-        return [str(x.strip()) for x in str(value).split(delim)]
+        else:
+            array = [str(x.strip()) for x in str(value).split(delim)]
+
+        # Store the array for the next call
+        if cache is not None:
+            arrays[cache] = array
+        return list(array)
+
+
+
+    ############################################################
+
+    '''
+    Returns a NumPy array from the values of the data. This assumes data is seperated by ,
+    The whole value is converted at once, and the array is cached until the value changes.
+    The returned array is read-only, so use .copy() to change the values.
+    If NumPy is not installed, the list from get_array is returned instead.
+    @param  key: str        The key of the parameter to look for
+    @param  default         The default value if no key has been found
+    @param  dtype           The type of the array. If None, the type is found from the values
+    @param  delim           A character to split the list by from the values (, by default)
+    @returns                The array of values
+    '''
+    def get_ndarray (self, key: str, default = None, dtype = None, delim = ','):
+
+        # Check for a cached array
+        arrays = self._arrays
+        try:
+            cache = ("ndarray", key.lower(), default, dtype, delim)
+            return arrays[cache]
+        except KeyError:
+            pass
+        except TypeError:
+            cache = None
+
+        # NumPy is optional and slow to import, so it is only imported when needed
+        # The list of values is used without NumPy
+        try:
+            import numpy
+        except ImportError:
+            return self.get_array(key, default, delim = delim)
+
+        # Convert the value
+        array = Params.__ndarray(str(self.get(key, default)), dtype, delim)
+        array.flags.writeable = False
+
+        # Store the array for the next call
+        if cache is not None:
+            arrays[cache] = array
+        return array
+
+
+
+    ############################################################
+
+    '''
+    Converts a string of values into a NumPy array.
+    Numbers are converted in a single call, trying integers and then floats if no type is given.
+    Other values are converted to an array of booleans or strings.
+    @param  value: str      The string of values
+    @param  dtype           The type of the array, or None to find the type
+    @param  delim           The character that the values are separated by
+    @returns                The array of values
+    '''
+    @staticmethod
+    def __ndarray (value: str, dtype, delim: str):
+        import numpy
+        count = value.count(delim) + 1
+
+        # Attempt to read all of the values as numbers
+        # The values are only valid if every value has been read
+        if dtype is not None:
+            types = (dtype,) if numpy.dtype(dtype).kind in "iuf" else ()
+        elif "." in value or "e" in value.lower() or "n" in value.lower():
+            types = (numpy.float64,)
+        else:
+            types = (numpy.int64, numpy.float64)
+
+        for t in types:
+            try:
+                with warnings.catch_warnings():
+                    warnings.simplefilter("ignore", DeprecationWarning)
+                    array = numpy.fromstring(value, dtype=t, sep=delim)
+            except ValueError:
+                continue
+            if len(array) != count:
+                continue
+
+            # Integers that do not fit the type are clamped or wrapped when read
+            # The values are read as floats if no type is given, otherwise the type is invalid
+            if array.dtype.kind in "iu" and Params.__overflows(value, array, delim):
+                if dtype is not None:
+                    raise ValueError("The values of '%s' do not fit in %s." % (value, array.dtype))
+                continue
+            return array
+
+        # Otherwise convert each value
+        items = [x.strip() for x in value.split(delim)]
+        booleans = all([x.lower() in ("t", "f", "true", "false") for x in items])
+
+        if dtype is None and booleans or dtype is not None and numpy.dtype(dtype).kind == "b":
+            if not booleans:
+                raise ValueError("Unable to convert '%s' to an array of booleans." % value)
+            return numpy.array([x.lower()[0] == "t" for x in items], dtype=bool)
+
+        # Invalid numbers raise a ValueError here
+        return numpy.array(items).astype(dtype) if dtype is not None else numpy.array(items)
+
+
+
+    ############################################################
+
+    '''
+    Checks if the integers read into an array do not match the string of values.
+    Only strings with a number longer than the type can hold are checked value by value.
+    @param  value: str      The string of values
+    @param  array           The array of integers read from the values
+    @param  delim           The character that the values are separated by
+    @returns                True if any value did not fit in the type of the array
+    '''
+    @staticmethod
+    def __overflows (value: str, array, delim: str) -> bool:
+        import numpy
+        digits = len(str(numpy.iinfo(array.dtype).max)) - 1
+        if re.search(r"\d{%d}" % (digits + 1), value) is None:
+            return False
+
+        try:
+            return [int(x) for x in value.split(delim)] != array.tolist()
+        except ValueError:
+            return True
 
 
 
     ############################################################
 
     '''
-    Returns a dictionary of all of the values, as passed with a key
+    Returns a dictionary of all of the values, as passed with a key.
+    The dictionary is read-only and is shared between calls until a value changes.
     @returns                The dictionary of values
     '''
     def get_all (self) -> dict:
 
+        # Check for the cached values
+        cached = self._all
+        if cached is not None and cached[0] == self._generation:
+            return cached[1]
+
+        # Use the values from the server, if the file has not been read
+        if self._reader is None and self._remote is not None:
+            self._all = (self._generation, MappingProxyType(dict(self._remote)))
+            return self._all[1]
+
+        # Use the values from the shared memory, if the file has not been read
+        shared = self._shared
+        if shared is not None:
+            self._all = (self._generation, MappingProxyType(dict(shared.items())))
+            return self._all[1]
+
+        # Use a single version of the arguments, in case they change while reading
+        generation = self._generation
+        args = self.reader.args
+
         # Store a dictionary of values
         arg_vals = {}
 
         # Loop through all of the keys and set the value
-        for key in self.reader.args.keys():
-            arg_vals[key] = self.reader.arg(key)()
+        for key, arg in args.items():
+            arg_vals[key] = arg()
 
         # Returns the new list
+        arg_vals = MappingProxyType(arg_vals)
+        self._all = (generation, arg_vals)
         return arg_vals
 
 
     
+    ############################################################
+
+    '''
+    Returns the values within a section of dotted keys, such as "solver" for the "solver." keys.
+    Only the keys within the section are read.
+    @param  name: str       The name of the section, which may itself be dotted ("net.encoder")
+    @returns                A read-only dictionary of the keys without the section name, and their values
+    '''
+    def section (self, name: str) -> dict:
+        name = name.lower().strip(".")
+        keys = self.__index().section(name)
+        start = len(name) + 1 if name != "" else 0
+        return MappingProxyType(dict(zip([key[start:] for key in keys], self.get_many(keys))))
+
+
+
+    ############################################################
+
+    '''
+    Returns the values of the keys that match a glob pattern, such as "net.*.size"
+    @param  pattern: str    The glob pattern, using *, ? and [] wildcards
+    @returns                A read-only dictionary of the matching keys and their values
+    '''
+    def query (self, pattern: str) -> dict:
+        keys = self.__index().glob(pattern.lower())
+        return MappingProxyType(dict(zip(keys, self.get_many(keys))))
+
+
+
+    ############################################################
+
+    '''
+    Returns the ordered index of the file keys, creating it the first time it is needed
+    @returns                The index of keys
+    '''
+    def __index (self) -> KeyIndex:
+        index = self._index
+        if index is None:
+            shared = self._shared
+            index = KeyIndex(shared.keys() if shared is not None else self.reader.args.keys())
+            self._index = index
+        return index
+
+
+
+    ############################################################
+
+    '''
+    Returns the file arguments to list or edit for a filter from the command line
+    @param  pattern         A prefix or glob pattern of the keys, or True for every argument
+    @returns                The list of arguments
+    '''
+    def __filter (self, pattern) -> list:
+        args = self.reader.args
+        if pattern is None or pattern == True or Arg.convert(pattern) == True:
+            return list(args.values())
+        return [args[key] for key in self.__index().filter(str(pattern).lower())]
+
+
+
+    ############################################################
+
+    '''
+    Returns a sweep over every combination of the values of some parameters.
+    The combinations are created as they are iterated, and can be split into shards.
+    @param  axes            The keys to sweep over, using the options or array of values of each
+                            parameter, or a dictionary of keys and their list of values
+    @param  index           The index of the shard to return, starting from 0
+    @param  count           The number of shards the sweep is split into
+    @returns                The sweep of combinations
+    '''
+    def sweep (self, axes, index = 0, count = 1) -> Sweep:
+        return Sweep(self, axes, index, count)
+
+
+
+    ############################################################
+
+    '''
+    Collects changes to the file values and applies them as a single update.
+    Readers see either all or none of the changes, and the file is written once.
+    @param  save            Whether to write the changes to the file
+    @returns                A context that yields a dictionary for the new values
+    '''
+    def transaction (self, save = True):
+        return self.reader.transaction(save)
+
+
+
+    ############################################################
+
+    '''
+    Checks every value in the file, and every command value for a parameter in the file,
+    against the type, options, range and pattern of the parameter.
+    All of the errors are found before any are reported.
+    @param  strict          Whether to raise a ValueError if there are any errors
+    @returns                The list of errors, which is empty if all values are valid
+    '''
+    def validate_all (self, strict = True) -> list:
+        errors = []
+        args = self.reader.args
+
+        # Check the file values
+        for key, arg in args.items():
+            for error in arg.check():
+                errors.append("%s: %s" % (key, error))
+
+        # Check the command values, which are read as the type of the parameter
+        # Values that cannot be read are checked as they were given, so the error shows the value
+        for key, value in self._overrides.items():
+            arg = args.get(key)
+            if arg is None:
+                continue
+            command = self.commands.get(key, value)
+            if isinstance(command, str) and not arg.options:
+                try:
+                    value = arg.validator.coerce(command)
+                except ValueError:
+                    value = command
+            for error in arg.check(value):
+                errors.append("-%s: %s" % (key, error))
+
+        if strict and len(errors) > 0:
+            raise ValueError("Invalid parameters in %s:\n\t%s" % (self.paramfile, "\n\t".join(errors)))
+        return errors
+
+
+
     ############################################################
 
     '''
@@ -150,11 +828,84 @@ class Params:
     '''
     @property
     def list (self) -> list:
-        # Returns the list of keys
+        # Returns the list of keys, from the shared memory if the file has not been read
+        if self._shared is not None:
+            return self._shared.keys()
         return list(self.reader.args.keys())
 
 
     
+    ############################################################
+
+    '''
+    Looks up a value that is missing from the table of values.
+    The file values are added to the table the first time a value is missing.
+    @param  key: str        The lower case key of the parameter
+    @returns                The value from the parameter, or None if it does not exist
+    '''
+    def __lookup (self, key: str) -> object:
+
+        # Read the value from the shared memory, if the file has not been read
+        shared = self._shared
+        if shared is not None:
+            return shared.get(key)
+
+        # The value does not exist if the file has already been added
+        if self._merged:
+            return None
+
+        # Add the file values underneath the command values
+        # The lock stops any changes from being made while the table is created
+        reader = self.reader
+        with reader.lock:
+            if not self._merged:
+                values = {}
+                for k, arg in reader.args.items():
+                    values[k] = arg()
+                values.update(self._overrides)
+                self._values = values
+                self._merged = True
+
+        return self._values.get(key)
+
+
+
+    ############################################################
+
+    '''
+    Updates the cached values after some file values have changed
+    @param  keys: set       The keys of the values that have changed
+    '''
+    def __changed (self, keys: set):
+
+        # Create a new table so that current readers are unaffected
+        if self._merged:
+            args = self.reader.args
+            values = dict(self._values)
+            for key in keys:
+                if key in self._overrides:
+                    continue
+                if key in args:
+                    values[key] = args[key]()
+                else:
+                    values.pop(key, None)
+            self._values = values
+
+        # Remove the index of keys if any keys have been added or removed
+        index = self._index
+        if index is not None:
+            args = self.reader.args
+            for key in keys:
+                if (key in args) != (key in index):
+                    self._index = None
+                    break
+
+        # Remove the cached arrays and dictionary of all values
+        self._generation += 1
+        self._arrays = {}
+
+
+
     ############################################################
 
     '''
@@ -219,12 +970,12 @@ class Params:
         print("%sDISPLAYING %s PARAMETER FILE%s" % (Color.HEADER, self.paramfile, Color.END))
         print("------------------------------------------------------------")
 
-        # Loop through each argument
-        for idx, arg in enumerate(self.reader.args.values()):
+        # Loop through each argument, or the arguments matching a prefix or pattern
+        for idx, arg in enumerate(self.__filter(self.commands["list"])):
 
             # Get the options
             if len(arg.values) > 0 and arg.values[0] != "":
-                options = "\n\tOptions = %s%s%s" % (Color.OPTIONS, arg.values, Color.END)
+                options = "\n\tOptions = %s%s%s" % (Color.OPTIONS, list(arg.values), Color.END)
             else:
                 options = ""
 
@@ -244,7 +995,7 @@ class Params:
 
     '''
     Displays an interface to edit a parameter file.
-    @param  key: str        The key of the parameter to edit. If None, then it will edit all
+    @param  key: str        The key, prefix or glob pattern of the parameters to edit. If None, then it will edit all
     '''
     def __edit (self, key = None):
 
@@ -256,30 +1007,28 @@ class Params:
         # Print out the information about skipping
         print("\nHit 'enter' to use default, %s-q%s to stop editing." % (Color.INPUT, Color.END))
 
-        # Loop through each value
-        for arg in self.reader.args.values():
-
-            # Check if this is the key needing to edit or if it is editing all keys
-            if key == True or key == arg.key:
+        # Loop through each value, or the values matching a key, prefix or pattern
+        args = self.reader.args
+        for arg in [args[key]] if isinstance(key, str) and key in args else self.__filter(key):
 
-                # Get options list if exists
-                if len(arg.values) > 0 and arg.values[0] != "":
-                    options = "\n\tOptions = %s%s%s" % (Color.OPTIONS, arg.values, Color.END)
-                else:
-                    options = ""
+            # Get options list if exists
+            if len(arg.values) > 0 and arg.values[0] != "":
+                options = "\n\tOptions = %s%s%s" % (Color.OPTIONS, list(arg.values), Color.END)
+            else:
+                options = ""
 
-                # Check for using default values
-                val = input("\n%sEnter value for %s%s%s (%s%s%s)%s\n\tDefault = %s%s%s: %s" % \
-                    (Color.END, Color.PARAM, arg.name, Color.END,
-                    Color.PARAM, arg.key, Color.END, options,
-                    Color.DEFAULT, str(arg.value), Color.END, Color.INPUT))
+            # Check for using default values
+            val = input("\n%sEnter value for %s%s%s (%s%s%s)%s\n\tDefault = %s%s%s: %s" % \
+                (Color.END, Color.PARAM, arg.name, Color.END,
+                Color.PARAM, arg.key, Color.END, options,
+                Color.DEFAULT, str(arg.value), Color.END, Color.INPUT))
 
-                # Check for quit parameters
-                if val.lower() in ("-q", "\\"):
-                    break
+            # Check for quit parameters
+            if val.lower() in ("-q", "\\"):
+                break
 
-                # Set the new argument
-                arg.parse(val)
+            # Set the new argument
+            arg.parse(val)
 
         # Make sure to reset the colours
         print(Color.RESET)
@@ -0,0 +1,190 @@
+import os
+import re
+import json
+import mmap
+import time
+import atexit
+import threading
+from .lock import FileLock
+
+# Class that records the effective parameters of each run in a log
+# Each run is a single line of JSON, with the time, the script, the command line arguments,
+# the parameter files and the values, which are always last on the line:
+#   {"time":1700000000.0,"script":"train.py","argv":[...],"files":[...],"values":{...}}
+# The lines are buffered and appended in batches, and the log is rotated once it is too large
+class Provenance:
+
+
+    ############################################################
+    # DEFINED CONSTANTS
+
+    # The default log file
+    PATH = "params.runs"
+
+    # The number of bytes the log can reach before it is rotated
+    LIMIT = 64 * 1024 * 1024
+
+    # The number of rotated logs that are kept
+    KEEP = 5
+
+    # The number of runs that are buffered before they are written
+    BATCH = 100
+
+    # The open logs for each path, which are shared within the process
+    LOGS = {}
+
+    # The lock for the open logs
+    LOCK = threading.Lock()
+
+
+
+    ############################################################
+
+    # Constructor for the log
+    # Takes in the path of the log, the number of bytes before rotating, the number of rotated
+    # logs to keep and the number of runs to buffer before writing
+    def __init__ (self, path = PATH, limit = LIMIT, keep = KEEP, batch = BATCH):
+        self.path = os.path.abspath(path)
+        self.limit = limit
+        self.keep = keep
+        self.batch = batch
+        self.buffer = []
+        self.lock = threading.Lock()
+
+
+
+    ############################################################
+
+    # Returns the shared log for a path, which is written when the process exits
+    @staticmethod
+    def open (path = PATH):
+        key = os.path.abspath(path)
+        with Provenance.LOCK:
+            log = Provenance.LOGS.get(key)
+            if log is None:
+                log = Provenance.LOGS[key] = Provenance(key)
+                atexit.register(log.flush)
+            return log
+
+
+
+    ############################################################
+
+    # Records the effective values of a run, writing the buffered runs once the batch is full
+    # Takes in the dictionary of values, the name of the script, the command line arguments
+    # and the list of parameter files
+    def record (self, values: dict, script = "", argv = (), files = ()):
+        line = '{"time":%r,"script":%s,"argv":%s,"files":%s,"values":%s}\n' % (
+            time.time(), json.dumps(str(script)), json.dumps([str(a) for a in argv], separators=(",", ":")),
+            json.dumps([str(f) for f in files], separators=(",", ":")), json.dumps(values, separators=(",", ":"), default=str))
+
+        with self.lock:
+            self.buffer.append(line)
+            full = len(self.buffer) >= self.batch
+        if full:
+            self.flush()
+
+
+
+    ############################################################
+
+    # Writes the buffered runs to the log in a single append
+    # The log is locked while writing, so the runs from many processes are never mixed
+    def flush (self):
+        with self.lock:
+            lines, self.buffer = self.buffer, []
+        if len(lines) == 0:
+            return
+
+        data = "".join(lines).encode("utf-8")
+        with FileLock(self.path):
+            try:
+                if os.path.getsize(self.path) + len(data) > self.limit:
+                    self.rotate()
+            except OSError:
+                pass
+
+            fd = os.open(self.path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+            try:
+                os.write(fd, data)
+            finally:
+                os.close(fd)
+
+
+
+    ############################################################
+
+    # Moves the log to the first rotated log, moving each older log along and removing the oldest
+    # This is called with the log locked
+    def rotate (self):
+        for number in range(self.keep, 0, -1):
+            older = "%s.%d" % (self.path, number)
+            newer = "%s.%d" % (self.path, number - 1) if number > 1 else self.path
+            if os.path.exists(newer):
+                os.replace(newer, older)
+        if self.keep == 0 and os.path.exists(self.path):
+            os.remove(self.path)
+
+
+
+    ############################################################
+
+    # Returns the paths of the existing logs, from the oldest to the current log
+    def paths (self) -> list:
+        paths = ["%s.%d" % (self.path, number) for number in range(self.keep, 0, -1)] + [self.path]
+        return [path for path in paths if os.path.exists(path)]
+
+
+
+    ############################################################
+
+    # Yields the record of each run, from the oldest run
+    # Lines that are incomplete, such as from a write that was interrupted, are skipped
+    def runs (self):
+        for path in self.paths():
+            with open(path, "r", encoding="utf-8") as file:
+                for line in file:
+                    try:
+                        yield json.loads(line)
+                    except ValueError:
+                        continue
+
+
+
+    ############################################################
+
+    # Returns the history of a key as a list of the time and value of each run that has the key
+    # The logs are searched for the key directly, so only the runs with the key are parsed
+    def history (self, key) -> list:
+        key = str(key).lower()
+        pattern = re.compile(re.escape(json.dumps(key).encode("utf-8")) + rb":")
+        decoder = json.JSONDecoder()
+        history = []
+
+        for path in self.paths():
+            with open(path, "rb") as file:
+                if os.fstat(file.fileno()).st_size == 0:
+                    continue
+                with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as data:
+                    for match in pattern.finditer(data):
+
+                        # Only use the key within the values, which come after the other fields
+                        start = data.rfind(b"\n", 0, match.start()) + 1
+                        if data.find(b'"values":{', start, match.start()) == -1:
+                            continue
+
+                        # Read the time from the start of the line and the value after the key
+                        try:
+                            when = float(data[start + 8:data.find(b",", start)])
+                            end = data.find(b"\n", match.end())
+                            line = data[match.end():end if end != -1 else len(data)].decode("utf-8")
+                            value = decoder.raw_decode(line)[0]
+                        except ValueError:
+                            continue
+                        history.append((when, value))
+
+        return history
+
+
+
+    ############################################################
@@ -0,0 +1,87 @@
+import keyword
+
+# Class that creates frozen record classes with a slot for each parameter
+# Reading a value from a record is a plain attribute load, which is faster than a lookup by key
+class Record:
+
+
+    ############################################################
+    # DEFINED CONSTANTS
+
+    # The created classes for each name and set of typed fields
+    CLASSES = {}
+
+
+
+    ############################################################
+
+    # Returns whether a key can be used as the name of a field
+    @staticmethod
+    def valid (key) -> bool:
+        return isinstance(key, str) and key.isidentifier() and not keyword.iskeyword(key) and not key.startswith("__")
+
+
+
+    ############################################################
+
+    # Returns the frozen class for a list of fields, creating the class if it does not exist
+    # Takes in the name of the class and a list of (field, type) pairs
+    @staticmethod
+    def compile (name, fields) -> type:
+        fields = tuple(fields)
+        try:
+            return Record.CLASSES[(name, fields)]
+        except KeyError:
+            pass
+
+        slots = tuple([f for f, _ in fields])
+
+        # The records cannot be changed once they are created
+        def __setattr__ (self, key, value):
+            raise AttributeError("'%s' is read-only, cannot set '%s'." % (name, key))
+
+        def __delattr__ (self, key):
+            raise AttributeError("'%s' is read-only, cannot delete '%s'." % (name, key))
+
+        def __repr__ (self):
+            return "%s(%s)" % (name, ", ".join(["%s=%r" % (s, getattr(self, s)) for s in slots]))
+
+        def __eq__ (self, other):
+            if type(other) is not type(self):
+                return NotImplemented
+            return all([getattr(self, s) == getattr(other, s) for s in slots])
+
+        def __hash__ (self):
+            return hash(tuple([getattr(self, s) for s in slots]))
+
+        def __iter__ (self):
+            return iter([(s, getattr(self, s)) for s in slots])
+
+        namespace = {
+            "__slots__":        slots,
+            "__annotations__":  dict(fields),
+            "__setattr__":      __setattr__,
+            "__delattr__":      __delattr__,
+            "__repr__":         __repr__,
+            "__eq__":           __eq__,
+            "__hash__":         __hash__,
+            "__iter__":         __iter__,
+        }
+        cls = type(name, (), namespace)
+        return Record.CLASSES.setdefault((name, fields), cls)
+
+
+
+    ############################################################
+
+    # Creates a record of a class from a dictionary of the values of each field
+    @staticmethod
+    def create (cls, values: dict):
+        record = object.__new__(cls)
+        for slot in cls.__slots__:
+            object.__setattr__(record, slot, values[slot])
+        return record
+
+
+
+    ############################################################
@@ -0,0 +1,390 @@
+#!/usr/bin/python3
+
+# Server that reads and watches parameter files and serves their values to other processes
+# Run from the directory containing the package:
+#   python3 -m params.server --address /tmp/params.sock --files base.para,run.para
+
+import os
+import sys
+import json
+import time
+import socket
+import argparse
+import threading
+import socketserver
+from .file import ParamFile
+from .stack import ParamStack
+from .locator import Locator
+from .watch import Watcher
+
+# Class that serves the values of parameter files over a Unix socket or a local TCP port
+# Each set of files is read once and watched, and the values are sent with the version of
+# the files so that clients can keep the values until the files change
+class ParamServer:
+
+
+    ############################################################
+    # DEFINED CONSTANTS
+
+    # The largest request that is read from a client
+    LIMIT = 1024 * 1024
+
+
+
+    ############################################################
+
+    # Constructor for the server
+    # Takes in the address (a Unix socket path, a port or "host:port"), whether to watch
+    # the files for changes, the polling interval and whether to use the compiled cache
+    def __init__ (self, address, watch = True, interval = 1.0, cache = True):
+        self.address = ParamServer.parse_address(address)
+        self.watch = watch
+        self.interval = interval
+        self.cache = cache
+
+        # The readers and watchers for each set of files, and the open connections
+        self.readers = {}
+        self.watchers = []
+        self.connections = set()
+        self.lock = threading.Lock()
+
+        # The values are only compared between the same run of the server
+        self.epoch = time.time_ns()
+        self.server = None
+
+
+
+    ############################################################
+
+    # Returns the address of a socket from a Unix socket path, a port or "host:port"
+    # TCP sockets are always on the local machine unless a host is given
+    @staticmethod
+    def parse_address (address):
+        if isinstance(address, (tuple, list)):
+            return (str(address[0]), int(address[1]))
+        address = str(address)
+        if address.isdigit():
+            return ("127.0.0.1", int(address))
+        host, _, port = address.rpartition(":")
+        if host != "" and port.isdigit() and os.sep not in address:
+            return (host, int(port))
+        return address
+
+
+
+    ############################################################
+
+    # Returns the key and the options of a set of files, with the paths relative to the client
+    @staticmethod
+    def request_key (request) -> tuple:
+        cwd = request.get("cwd", ".")
+        files = [f if os.path.dirname(f) == "" else os.path.join(cwd, f) for f in request["files"]]
+        roots = request.get("roots") or "."
+        if isinstance(roots, str):
+            roots = [r.strip() for r in roots.split(",") if r.strip() != ""]
+        roots = [os.path.join(cwd, r) for r in roots]
+        exclude = request.get("exclude")
+        return repr((files, roots, exclude)), files, roots, exclude
+
+
+
+    ############################################################
+
+    # Returns the reader for a set of files, reading and watching the files the first time
+    def reader (self, request):
+        key, files, roots, exclude = ParamServer.request_key(request)
+        with self.lock:
+            reader = self.readers.get(key)
+            if reader is not None:
+                return reader
+
+            # Read the files without ever prompting, as there is no user
+            locator = Locator(roots, exclude)
+            if len(files) == 1:
+                reader = ParamFile(files[0], locator, True, self.cache)
+            else:
+                reader = ParamStack(files, locator, True, self.cache)
+
+            if self.watch:
+                self.watchers.append(Watcher(reader, interval = self.interval).start())
+            self.readers[key] = reader
+            return reader
+
+
+
+    ############################################################
+
+    # Returns the response for a request
+    # A "load" request returns all of the values, unless the client already has the current version
+    # A "get" request returns the values of a list of keys
+    def respond (self, request) -> dict:
+        try:
+            reader = self.reader(request)
+        except Exception as e:
+            return {"error": str(e)}
+
+        # Use a single version of the arguments, in case they change while reading
+        with reader.lock:
+            args = reader.args
+            version = [self.epoch, reader.version]
+
+        operation = request.get("op", "load")
+        if operation == "load":
+            if request.get("version") == version:
+                return {"version": version}
+            return {"version": version, "values": dict([(k, arg()) for k, arg in args.items()])}
+        if operation == "get":
+            keys = [k.lower() for k in request.get("keys", [])]
+            return {"version": version, "values": dict([(k, args[k]()) for k in keys if k in args])}
+        return {"error": "Unknown operation '%s'." % operation}
+
+
+
+    ############################################################
+
+    # Reads the files that are loaded before any requests
+    # Takes in the list of file names, which may each be a comma separated stack of files
+    def preload (self, files, roots = ".", exclude = None):
+        for names in files:
+            request = {"files": [f.strip() for f in names.split(",") if f.strip() != ""],
+                "cwd": os.getcwd(), "roots": roots, "exclude": exclude}
+            self.reader(request)
+
+
+
+    ############################################################
+
+    # Serves requests until the server is stopped
+    def serve (self):
+        server = self
+
+        # Each connection may send any number of requests, each on its own line
+        class Handler (socketserver.StreamRequestHandler):
+            def setup (self):
+                socketserver.StreamRequestHandler.setup(self)
+                with server.lock:
+                    server.connections.add(self.connection)
+
+            def finish (self):
+                with server.lock:
+                    server.connections.discard(self.connection)
+                socketserver.StreamRequestHandler.finish(self)
+
+            def handle (self):
+                while True:
+                    line = self.rfile.readline(ParamServer.LIMIT)
+                    if not line:
+                        return
+                    try:
+                        response = server.respond(json.loads(line))
+                    except ValueError as e:
+                        response = {"error": str(e)}
+                    self.wfile.write((json.dumps(response, default=str) + "\n").encode("utf-8"))
+                    self.wfile.flush()
+
+        # Create the Unix or TCP server
+        if isinstance(self.address, tuple):
+            socketserver.ThreadingTCPServer.allow_reuse_address = True
+            self.server = socketserver.ThreadingTCPServer(self.address, Handler)
+        else:
+            if os.path.exists(self.address):
+                os.remove(self.address)
+            self.server = socketserver.ThreadingUnixStreamServer(self.address, Handler)
+        self.server.daemon_threads = True
+
+        try:
+            self.server.serve_forever()
+        finally:
+            self.server.server_close()
+            if not isinstance(self.address, tuple) and os.path.exists(self.address):
+                os.remove(self.address)
+
+
+
+    ############################################################
+
+    # Starts serving requests in a background thread
+    def start (self):
+        thread = threading.Thread(target=self.serve, name="params-server", daemon=True)
+        thread.start()
+
+        # Wait for the socket to be ready
+        while self.server is None and thread.is_alive():
+            time.sleep(0.001)
+        return self
+
+
+
+    ############################################################
+
+    # Stops serving requests and watching the files
+    # The open connections are closed, so the clients read the files directly
+    def stop (self):
+        if self.server is not None:
+            self.server.shutdown()
+        with self.lock:
+            for connection in self.connections:
+                try:
+                    connection.shutdown(socket.SHUT_RDWR)
+                except OSError:
+                    pass
+        for watcher in self.watchers:
+            watcher.stop()
+        self.watchers = []
+
+
+
+    ############################################################
+
+
+
+# Class that reads parameter values from a server
+# Connections are kept open and reused, and the values are kept until their version changes
+# Any failure returns None, so the caller can read the files directly instead
+class ParamClient:
+
+
+    ############################################################
+    # DEFINED CONSTANTS
+
+    # The number of seconds to wait for the server
+    TIMEOUT = 1.0
+
+    # The open connections to each server that are not being used
+    POOL = {}
+
+    # The last values and version received for each server and set of files
+    CACHE = {}
+
+    # The lock for the pool and the cache
+    LOCK = threading.Lock()
+
+
+
+    ############################################################
+
+    # Returns the values of a set of files from a server, or None if the server cannot be used
+    # Takes in the server address, the list of files and the search roots and excluded directories
+    @staticmethod
+    def fetch (address, files, roots = ".", exclude = None) -> dict:
+        address = ParamServer.parse_address(address)
+        request = {"op": "load", "files": list(files), "cwd": os.getcwd(), "roots": roots, "exclude": exclude}
+        key = (address if isinstance(address, tuple) else os.path.abspath(address), repr(request))
+
+        # Send the version of the cached values, which are not sent again if they are current
+        with ParamClient.LOCK:
+            cached = ParamClient.CACHE.get(key)
+        if cached is not None:
+            request["version"] = cached[0]
+
+        response = ParamClient.request(address, request)
+        if response is None or "error" in response or "version" not in response:
+            return None
+        if "values" not in response:
+            return cached[1] if cached is not None and cached[0] == response["version"] else None
+
+        with ParamClient.LOCK:
+            ParamClient.CACHE[key] = (response["version"], response["values"])
+        return response["values"]
+
+
+
+    ############################################################
+
+    # Sends a request to a server using a pooled connection
+    # A pooled connection may have been closed by the server, so a new connection is tried after
+    # Returns the response, or None if the server cannot be reached
+    @staticmethod
+    def request (address, request) -> dict:
+        data = (json.dumps(request) + "\n").encode("utf-8")
+        for pooled in (True, False):
+            connection = ParamClient.__connect(address, pooled)
+            if connection is None:
+                continue
+
+            try:
+                sock, reader = connection
+                sock.sendall(data)
+                line = reader.readline()
+                if not line:
+                    raise ConnectionError("The server closed the connection.")
+                response = json.loads(line)
+            except (OSError, ValueError):
+                sock.close()
+                continue
+
+            # Return the connection to the pool
+            with ParamClient.LOCK:
+                ParamClient.POOL.setdefault(address, []).append(connection)
+            return response
+
+        return None
+
+
+
+    ############################################################
+
+    # Closes all of the pooled connections
+    @staticmethod
+    def close ():
+        with ParamClient.LOCK:
+            for connections in ParamClient.POOL.values():
+                for sock, _ in connections:
+                    sock.close()
+            ParamClient.POOL = {}
+
+
+
+    ############################################################
+
+    # Returns a pooled connection to a server, or a new connection
+    # Returns None if there is no pooled connection, or if the server cannot be reached
+    @staticmethod
+    def __connect (address, pooled):
+        if pooled:
+            with ParamClient.LOCK:
+                connections = ParamClient.POOL.get(address)
+                return connections.pop() if connections else None
+
+        try:
+            if isinstance(address, tuple):
+                sock = socket.create_connection(address, ParamClient.TIMEOUT)
+            else:
+                sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+                sock.settimeout(ParamClient.TIMEOUT)
+                sock.connect(address)
+        except (OSError, AttributeError):
+            return None
+        return (sock, sock.makefile("rb"))
+
+
+
+    ############################################################
+
+
+
+############################################################
+
+# Runs the parameter server
+def main ():
+    parser = argparse.ArgumentParser(description="Server for Params")
+    parser.add_argument("--address", required=True, help="Unix socket path, port or host:port to listen on")
+    parser.add_argument("--files", default="", help="files to read before any requests, separated by spaces, with each stack of files separated by commas")
+    parser.add_argument("--roots", default=".", help="comma separated directories to search for the files")
+    parser.add_argument("--exclude", help="comma separated directory patterns to skip")
+    parser.add_argument("--interval", type=float, default=1.0, help="seconds between checking the files for changes")
+    parser.add_argument("--no-watch", action="store_true", help="do not reload the files when they change")
+    options = parser.parse_args()
+
+    server = ParamServer(options.address, not options.no_watch, options.interval)
+    server.preload([f for f in options.files.split(" ") if f != ""], options.roots, options.exclude)
+    print("Serving parameters on %s" % (options.address,), file=sys.stderr)
+    try:
+        server.serve()
+    except KeyboardInterrupt:
+        server.stop()
+
+
+
+if __name__ == "__main__":
+    main()
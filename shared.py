@@ -0,0 +1,349 @@
+import os
+import json
+import zlib
+import struct
+import hashlib
+
+# Shared memory is only available from Python 3.8
+try:
+    from multiprocessing import shared_memory, resource_tracker
+except ImportError:
+    shared_memory = None
+
+# Class that publishes the values of a parameter file in shared memory
+# One process reads the file and publishes the values, and the other processes on the
+# same machine read the values directly from the shared memory without reading the file
+# The values are stored in a hash table, so each value is found without reading the others
+class SharedParams:
+
+
+    ############################################################
+    # DEFINED CONSTANTS
+
+    # The prefix of the names of the shared memory blocks
+    PREFIX = "params_"
+
+    # The version of the layout of the shared memory, which is changed whenever the layout changes
+    VERSION = 1
+
+    # The marker at the start of the shared memory, which is written once the values are complete
+    MAGIC = b"PARA"
+
+    # The header of the magic marker, version, length of the file information,
+    # number of slots in the hash table and the offset of the table
+    HEADER = struct.Struct("<4sIIII")
+
+    # Each slot of the hash table is the hash of the key, the offset and length of the key,
+    # the offset and length of the value and the kind of value
+    SLOT = struct.Struct("<IIIIIB3x")
+
+    # The kinds of values
+    STRING, INTEGER, FLOAT, BOOLEAN, LARGE = range(1, 6)
+
+    # The formats of the number values
+    NUMBERS = {INTEGER: struct.Struct("<q"), FLOAT: struct.Struct("<d"), BOOLEAN: struct.Struct("<?")}
+
+
+
+    ############################################################
+
+    # Constructor for the shared values
+    # Takes in the attached shared memory block
+    def __init__ (self, memory):
+        self.memory = memory
+        self.buffer = memory.buf
+
+        # Read the header and the information about the files
+        _, _, length, self.slots, self.table = self.HEADER.unpack_from(self.buffer, 0)
+        start = self.HEADER.size
+        self.files = json.loads(bytes(self.buffer[start:start + length]).decode("utf-8"))
+
+
+
+    ############################################################
+
+    # Returns the name of the shared memory for a set of options
+    # Processes started with the same options in the same directory use the same shared memory
+    @staticmethod
+    def name (*options) -> str:
+        key = repr((os.path.abspath("."),) + options).encode("utf-8")
+        return SharedParams.PREFIX + hashlib.sha1(key).hexdigest()[:20]
+
+
+
+    ############################################################
+
+    # Returns whether any of the files have changed since the values were published
+    @property
+    def stale (self) -> bool:
+        for path, size, mtime in self.files:
+            try:
+                stat = os.stat(path)
+            except OSError:
+                return True
+            if (stat.st_size, stat.st_mtime_ns) != (size, mtime):
+                return True
+        return False
+
+
+
+    ############################################################
+
+    # Returns the value of a key, or the default if the key does not exist
+    def get (self, key, default = None):
+        buffer = self.buffer
+        data = key.encode("utf-8")
+        code = zlib.crc32(data)
+        slot = code % self.slots
+
+        # Search the table from the slot of the hash until an empty slot
+        while True:
+            h, kpos, klen, vpos, vlen, kind = self.SLOT.unpack_from(buffer, self.table + slot * self.SLOT.size)
+            if klen == 0:
+                return default
+            if h == code and buffer[kpos:kpos + klen] == data:
+                return self.__decode(buffer, kind, vpos, vlen)
+            slot = (slot + 1) % self.slots
+
+
+
+    ############################################################
+
+    # Returns whether a key exists
+    def __contains__ (self, key):
+        return self.get(key, self) is not self
+
+
+
+    ############################################################
+
+    # Returns the keys of all of the values, in the order of the file
+    def keys (self) -> list:
+        buffer = self.buffer
+        return [bytes(buffer[kpos:kpos + klen]).decode("utf-8") for _, kpos, klen, _, _, _ in self.__slots()]
+
+
+
+    ############################################################
+
+    # Returns the pairs of keys and values, in the order of the file
+    def items (self) -> list:
+        buffer = self.buffer
+        return [(bytes(buffer[kpos:kpos + klen]).decode("utf-8"), self.__decode(buffer, kind, vpos, vlen))
+            for _, kpos, klen, vpos, vlen, kind in self.__slots()]
+
+
+
+    ############################################################
+
+    # Returns the used slots of the table
+    # The slots are sorted by the position of the key, as the values are stored in the order of the file
+    def __slots (self) -> list:
+        slots = []
+        for slot in range(0, self.slots):
+            entry = self.SLOT.unpack_from(self.buffer, self.table + slot * self.SLOT.size)
+            if entry[2] > 0:
+                slots.append(entry)
+        slots.sort(key = lambda entry: entry[1])
+        return slots
+
+
+
+    ############################################################
+
+    # Detaches from the shared memory
+    def close (self):
+        self.buffer = None
+        self.memory.close()
+
+
+
+    ############################################################
+
+    # Removes the shared memory, so no other processes can attach to it
+    # Processes that are already attached can still read the values
+    def unlink (self):
+        SharedParams.__unlink(self.memory)
+
+
+
+    ############################################################
+
+    # Removes the shared values with a name, if they exist
+    # Returns whether the shared values were removed
+    @staticmethod
+    def remove (name) -> bool:
+        if shared_memory is None:
+            return False
+
+        try:
+            memory = SharedParams.__open(name)
+        except (OSError, ValueError):
+            return False
+        SharedParams.__unlink(memory)
+        memory.close()
+        return True
+
+
+
+    ############################################################
+
+    # Attaches to the shared values with a name
+    # Returns None if the shared memory does not exist, is incomplete, has a different
+    # layout or if any of the files have changed since the values were published
+    @staticmethod
+    def attach (name):
+        if shared_memory is None:
+            return None
+
+        try:
+            memory = SharedParams.__open(name)
+        except (OSError, ValueError):
+            return None
+
+        # Check that the values are complete and current
+        try:
+            magic, version, _, _, _ = SharedParams.HEADER.unpack_from(memory.buf, 0)
+            if magic == SharedParams.MAGIC and version == SharedParams.VERSION:
+                shared = SharedParams(memory)
+                if not shared.stale:
+                    return shared
+        except (struct.error, ValueError):
+            pass
+
+        memory.close()
+        return None
+
+
+
+    ############################################################
+
+    # Publishes the values of a reader (a ParamFile or ParamStack) with a name
+    # Any older values with the same name are replaced
+    # Returns the shared values, or None if the values could not be published
+    @staticmethod
+    def publish (name, reader):
+        if shared_memory is None:
+            return None
+
+        # Find the state of the files, before the values are read
+        paths = reader.paths if hasattr(reader, "paths") else [reader.path]
+        files = []
+        for path in paths:
+            stat = os.stat(path)
+            files.append([os.path.abspath(path), stat.st_size, stat.st_mtime_ns])
+
+        # Encode the keys and values
+        entries = []
+        for key, arg in reader.args.items():
+            kind, value = SharedParams.__encode(arg())
+            entries.append((key.encode("utf-8"), kind, value))
+
+        # Find the size of each part, keeping the table at most half full
+        info = json.dumps(files).encode("utf-8")
+        slots = max(8, len(entries) * 2)
+        table = SharedParams.HEADER.size + len(info)
+        data = table + slots * SharedParams.SLOT.size
+        size = data + sum([len(k) + len(v) for k, _, v in entries])
+
+        # Replace any older values
+        SharedParams.remove(name)
+
+        try:
+            memory = SharedParams.__open(name, size)
+        except (OSError, ValueError):
+            return None
+        buffer = memory.buf
+
+        # Write the information about the files
+        buffer[SharedParams.HEADER.size:table] = info
+
+        # Write the keys and values, and the slot of each key
+        position = data
+        for key, kind, value in entries:
+            code = zlib.crc32(key)
+            slot = code % slots
+            while SharedParams.SLOT.unpack_from(buffer, table + slot * SharedParams.SLOT.size)[2] != 0:
+                slot = (slot + 1) % slots
+
+            buffer[position:position + len(key)] = key
+            buffer[position + len(key):position + len(key) + len(value)] = value
+            SharedParams.SLOT.pack_into(buffer, table + slot * SharedParams.SLOT.size,
+                code, position, len(key), position + len(key), len(value), kind)
+            position += len(key) + len(value)
+
+        # The values are only read once the header is written
+        SharedParams.HEADER.pack_into(buffer, 0, SharedParams.MAGIC, SharedParams.VERSION, len(info), slots, table)
+        return SharedParams(memory)
+
+
+
+    ############################################################
+
+    # Opens or creates the shared memory with a name
+    # The shared memory is not removed when the process exits, so that other processes can still read it
+    @staticmethod
+    def __open (name, size = 0):
+        create = size > 0
+        try:
+            return shared_memory.SharedMemory(name, create, size, track = False)
+        except TypeError:
+            pass
+
+        # Before Python 3.13, the shared memory must be removed from the resource tracker
+        memory = shared_memory.SharedMemory(name, create, size)
+        try:
+            resource_tracker.unregister(memory._name, "shared_memory")
+            memory.untracked = True
+        except Exception:
+            pass
+        return memory
+
+
+
+    ############################################################
+
+    # Removes shared memory that was opened by __open
+    # Shared memory removed from the resource tracker must be added back first, as it is
+    # removed from the tracker again when the shared memory is removed
+    @staticmethod
+    def __unlink (memory):
+        if getattr(memory, "untracked", False):
+            resource_tracker.register(memory._name, "shared_memory")
+        memory.unlink()
+
+
+
+    ############################################################
+
+    # Encodes a value as the kind of value and the bytes of the value
+    @staticmethod
+    def __encode (value) -> tuple:
+        if type(value) is bool:
+            kind = SharedParams.BOOLEAN
+        elif type(value) is int:
+            kind = SharedParams.INTEGER if -2 ** 63 <= value < 2 ** 63 else SharedParams.LARGE
+        elif type(value) is float:
+            kind = SharedParams.FLOAT
+        else:
+            return SharedParams.STRING, str(value).encode("utf-8")
+
+        if kind == SharedParams.LARGE:
+            return kind, str(value).encode("utf-8")
+        return kind, SharedParams.NUMBERS[kind].pack(value)
+
+
+
+    ############################################################
+
+    # Decodes a value from the shared memory
+    @staticmethod
+    def __decode (buffer, kind, position, length):
+        if kind in SharedParams.NUMBERS:
+            return SharedParams.NUMBERS[kind].unpack_from(buffer, position)[0]
+        value = str(buffer[position:position + length], "utf-8")
+        return int(value) if kind == SharedParams.LARGE else value
+
+
+
+    ############################################################
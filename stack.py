@@ -0,0 +1,312 @@
+import os
+import functools
+import threading
+from contextlib import contextmanager
+from .file import ParamFile
+from .locator import Locator
+
+# Class that reads an ordered stack of parameter files and merges them into one view
+# Parameters in later files override the same parameters in earlier files
+# The stack can be used in place of a single ParamFile
+class ParamStack:
+
+
+    ############################################################
+
+    # Constructor for reading the files
+    # Takes in the list of para files from the base file to the top file, and the
+    # locator, headless, cache, stats and journal options used for each ParamFile
+    def __init__ (self, files, locator = None, headless = None, cache = True, stats = None, journal = None):
+
+        # Store the options for reading the layers again
+        self.locator = locator if locator is not None else Locator(stats = stats)
+        self.headless = ParamFile.is_headless() if headless is None else bool(headless)
+        self.cache = cache
+        self.stats = stats
+        self.journal = journal
+
+        # The merged arguments and the layer that owns each argument
+        self.args = {}
+        self.owners = {}
+
+        # The functions called with the changed keys whenever values change
+        self.listeners = []
+
+
+        # The lock that serialises all changes, and the version of the merged arguments
+        # The layers share the same lock so that changes are always made in the same order
+        self.lock = threading.RLock()
+        self.version = 0
+
+        # Read each of the layers, which each use their own compiled cache
+        self.layers = []
+        self.versions = []
+        for file in files:
+            layer = ParamFile(file, self.locator, headless, cache, stats, journal)
+            layer.lock = self.lock
+            layer.subscribe(self.__changed)
+            self.layers.append(layer)
+            self.versions.append(self.__version(layer.path))
+
+        # Create the merged view of the layers
+        self.__merge()
+
+
+
+    ############################################################
+
+    # Returns the path of the top layer
+    @property
+    def path (self) -> str:
+        return self.layers[-1].path
+
+
+
+    ############################################################
+
+    # Returns the paths of all of the layers
+    @property
+    def paths (self) -> list:
+        return [layer.path for layer in self.layers]
+
+
+
+    ############################################################
+
+    # Reads any layers whose files have changed and updates the merged view
+    # Only the changed lines of each changed layer are parsed again
+    # Returns the set of keys that have changed
+    def reload (self) -> set:
+        with self.lock:
+            keys = set()
+            for idx, layer in enumerate(self.layers):
+                version = self.__version(layer.path)
+                if version == self.versions[idx]:
+                    continue
+
+                self.versions[idx] = version
+                keys |= layer.reload()
+
+            return keys
+
+
+
+    ############################################################
+
+    # Writes the changed arguments back to the layer that owns them
+    # Returns whether any file was written
+    def write_file (self, file = None, force = False) -> bool:
+        if file is not None:
+            raise ValueError("A parameter stack can only be written back to its own files.")
+
+        with self.lock:
+            written = False
+            for layer in self.layers:
+                if layer.write_file(force = force):
+                    written = True
+            return written
+
+
+
+    ############################################################
+
+    # Writes the values in the journal of each layer into the layer's file
+    # Returns whether any file was written
+    def compact (self) -> bool:
+        with self.lock:
+            written = False
+            for layer in self.layers:
+                if layer.compact():
+                    written = True
+            return written
+
+
+
+    ############################################################
+
+    # Writes the changed arguments from a thread, without blocking the event loop
+    # Returns whether any file was written
+    async def awrite (self, file = None, force = False) -> bool:
+
+        # Asyncio is slow to import, so it is only imported when needed
+        import asyncio
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, functools.partial(self.write_file, file, force))
+
+
+
+    ############################################################
+
+    # Returns the set of keys that have been changed since being read or written
+    @property
+    def dirty_keys (self) -> set:
+        keys = set()
+        for layer in self.layers:
+            keys |= layer.dirty_keys
+        return keys
+
+
+
+    ############################################################
+
+    # Checks if any arguments have changed since being read or written
+    @property
+    def dirty (self) -> bool:
+        for layer in self.layers:
+            if layer.dirty:
+                return True
+        return False
+
+
+
+    ############################################################
+
+    # Sets the value of an argument in the layer that owns it
+    # Returns whether the value was changed
+    def set (self, key, value) -> bool:
+        return key in self.update({key: value})
+
+
+
+    ############################################################
+
+    # Sets the values of several arguments in the layers that own them
+    # Takes in a dictionary of keys and values
+    # Returns the set of keys that have changed
+    def update (self, values) -> set:
+        with self.lock:
+
+            # Group the values by the layer that owns them
+            layers = {}
+            for key, value in values.items():
+                layers.setdefault(self.owners[key], {})[key] = value
+
+            keys = set()
+            for layer, changes in layers.items():
+                keys |= layer.update(changes)
+            return keys
+
+
+
+    ############################################################
+
+    # Collects changes and applies them as a single update when the block ends
+    # The files are written once with all of the changes, unless save is False
+    # Yields a dictionary that the new values are added to
+    @contextmanager
+    def transaction (self, save = True):
+        with self.lock:
+            values = {}
+            yield values
+            self.update(values)
+            if save:
+                self.write_file()
+
+
+
+    ############################################################
+
+    # Adds a function that is called with the set of changed keys whenever values change
+    def subscribe (self, callback):
+        self.listeners.append(callback)
+
+
+
+    ############################################################
+
+    # Tells all listeners that some keys have changed
+    def notify (self, keys):
+        for callback in list(self.listeners):
+            callback(keys)
+
+
+
+    ############################################################
+
+    # Checks if argument exists
+    def exists (self, key) -> bool:
+        return key in self.args.keys()
+
+
+
+    ############################################################
+
+    # Gets the value of a key
+    def arg (self, key):
+        if self.exists(key):
+            return self.args[key]
+        return None
+
+
+
+    ############################################################
+
+    # Creates the merged arguments from all of the layers
+    def __merge (self):
+        args = {}
+        owners = {}
+        for layer in self.layers:
+            args.update(layer.args)
+            for key in layer.args.keys():
+                owners[key] = layer
+
+        self.args = args
+        self.owners = owners
+
+
+
+    ############################################################
+
+    # Updates the merged arguments after values in a layer have changed
+    # New dictionaries are swapped in, so readers see either the old or new arguments
+    def __changed (self, keys):
+        with self.lock:
+            args = dict(self.args)
+            owners = dict(self.owners)
+
+            for key in keys:
+
+                # Use the argument from the top layer that has the key
+                for layer in reversed(self.layers):
+                    if key in layer.args:
+                        args[key] = layer.args[key]
+                        owners[key] = layer
+                        break
+
+                # Otherwise the key has been removed from all layers
+                else:
+                    args.pop(key, None)
+                    owners.pop(key, None)
+
+            self.owners = owners
+            self.args = args
+            self.version += 1
+            self.notify(keys)
+
+
+
+    ############################################################
+
+    # Returns the size and modification time of a file
+    @staticmethod
+    def __version (path) -> tuple:
+        try:
+            stat = os.stat(path)
+            return (stat.st_size, stat.st_mtime_ns)
+        except OSError:
+            return None
+
+
+
+    ############################################################
+
+    # Prints all the arguments
+    def __str__ (self):
+        output = ""
+        for arg in self.args.values():
+            output += str(arg) + "\n"
+        return output
+
+
+
+    ############################################################
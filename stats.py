@@ -0,0 +1,94 @@
+import time
+from contextlib import contextmanager, nullcontext
+
+# Class that records the time spent in each phase and counts of events
+# When disabled, the phases and counts do nothing
+class Stats:
+
+
+    ############################################################
+    # DEFINED CONSTANTS
+
+    # The shared context used for phases when disabled
+    NULL = nullcontext()
+
+
+
+    ############################################################
+
+    # Constructor for the statistics
+    # Takes in whether the statistics are recorded and an optional hook function, which
+    # is called with the kind ("time" or "count"), the name and the value of each record
+    def __init__ (self, enabled = True, hook = None):
+        self.enabled = enabled
+        self.hook = hook
+        self.times = {}
+        self.counts = {}
+
+
+
+    ############################################################
+
+    # Returns a context that records the time spent within a phase
+    def phase (self, name):
+        if not self.enabled:
+            return self.NULL
+        return self.__timer(name)
+
+
+
+    ############################################################
+
+    # Adds to the count of an event
+    def count (self, name, value = 1):
+        if not self.enabled:
+            return
+        self.counts[name] = self.counts.get(name, 0) + value
+        if self.hook is not None:
+            self.hook("count", name, value)
+
+
+
+    ############################################################
+
+    # Adds to the time spent in a phase
+    def time (self, name, seconds):
+        if not self.enabled:
+            return
+        self.times[name] = self.times.get(name, 0.0) + seconds
+        if self.hook is not None:
+            self.hook("time", name, seconds)
+
+
+
+    ############################################################
+
+    # Returns a dictionary of the times in seconds and the counts
+    def report (self) -> dict:
+        return {"times": dict(self.times), "counts": dict(self.counts)}
+
+
+
+    ############################################################
+
+    # Removes all of the recorded times and counts
+    def reset (self):
+        self.times = {}
+        self.counts = {}
+
+
+
+    ############################################################
+
+    # Records the time of a phase
+    @contextmanager
+    def __timer (self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.time(name, time.perf_counter() - start)
+
+
+
+    ############################################################
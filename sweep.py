@@ -0,0 +1,172 @@
+import os
+import sys
+import collections
+from .argument import Arg
+
+# Class that sweeps over every combination of the values of some parameters
+# The combinations are created when needed, so very large sweeps are never stored in memory
+# Each combination has an index, so a sweep can be split into shards across workers or machines
+class Sweep:
+
+
+    ############################################################
+    # DEFINED CONSTANTS
+
+    # The commands that are not passed on to the parameters of each worker
+    # The workers only read the file and never list, edit, save or watch it
+    LOCAL_COMMANDS = ("para", "list", "edit", "save", "watch", "lazy", "stats")
+
+
+
+    ############################################################
+
+    # Constructor for the sweep
+    # Takes in the parameters and the axes to sweep, which are either a list of keys or a
+    # dictionary of keys and their values. For a list of keys, the option values of each
+    # parameter are used, or the array of values if the parameter has no options
+    def __init__ (self, params, axes, index = 0, count = 1):
+        self.params = params
+        self.index = int(index)
+        self.count = int(count)
+        if self.count < 1 or not 0 <= self.index < self.count:
+            raise ValueError("Invalid shard %d of %d." % (self.index, self.count))
+
+        # Find the values of each axis
+        if not isinstance(axes, dict):
+            axes = dict([(key.lower(), Sweep.values(params, key)) for key in axes])
+        self.keys = tuple([key.lower() for key in axes.keys()])
+        self.axes = tuple([tuple(values) for values in axes.values()])
+
+
+
+    ############################################################
+
+    # Returns the values of an axis for a parameter
+    @staticmethod
+    def values (params, key) -> list:
+        arg = params.reader.arg(key)
+        if arg is not None and arg.options:
+            return [Arg.convert(value) for value in arg.values if value in arg.validator.choices]
+        return params.get_array(key)
+
+
+
+    ############################################################
+
+    # Returns the total number of combinations in all of the shards
+    @property
+    def total (self) -> int:
+        total = 1
+        for values in self.axes:
+            total *= len(values)
+        return total
+
+
+
+    ############################################################
+
+    # Returns the number of combinations in this shard
+    def __len__ (self):
+        return len(range(self.index, self.total, self.count))
+
+
+
+    ############################################################
+
+    # Returns the combination with an index in the full sweep
+    # The last axis changes the fastest, in the same order as itertools.product
+    def combination (self, number) -> dict:
+        if not 0 <= number < self.total:
+            raise IndexError("Combination %d is outside of the sweep." % number)
+
+        combination = {}
+        for key, values in zip(reversed(self.keys), reversed(self.axes)):
+            number, position = divmod(number, len(values))
+            combination[key] = values[position]
+        return dict([(key, combination[key]) for key in self.keys])
+
+
+
+    ############################################################
+
+    # Iterates through the combinations in this shard
+    # Every shard takes each count'th combination, so the shards are evenly sized
+    def __iter__ (self):
+        for number in range(self.index, self.total, self.count):
+            yield self.combination(number)
+
+
+
+    ############################################################
+
+    # Returns the sweep for one of a number of shards
+    # The shards of the same sweep always have the same combinations
+    def shard (self, index, count):
+        return Sweep(self.params, dict(zip(self.keys, self.axes)), index, count)
+
+
+
+    ############################################################
+
+    # Runs a function for every combination in this shard using a pool of processes
+    # The function is called with a Params for the combination, which uses the same file and
+    # commands as these parameters with the combination values on top
+    # The function must be defined at the top level of a module so it can be sent to the workers
+    # Yields pairs of the combination and the result in the order of the combinations
+    def run (self, function, workers = None, pending = 4):
+        options = self.options()
+        workers = workers if workers is not None else os.cpu_count() or 1
+
+        # The process pool is slow to import, so it is only imported when needed
+        from concurrent.futures import ProcessPoolExecutor
+        with ProcessPoolExecutor(workers) as executor:
+            limit = max(1, workers * pending)
+            queue = collections.deque()
+
+            # Keep a limited number of combinations waiting, so the sweep is never stored
+            for combination in self:
+                queue.append((combination, executor.submit(Sweep.call, function, options, combination)))
+                if len(queue) >= limit:
+                    combination, future = queue.popleft()
+                    yield combination, future.result()
+
+            while queue:
+                combination, future = queue.popleft()
+                yield combination, future.result()
+
+
+
+    ############################################################
+
+    # Returns the commands that are used to create the parameters of each worker
+    def options (self) -> dict:
+        reader = self.params.reader
+        paths = reader.paths if hasattr(reader, "paths") else [reader.path]
+
+        options = {}
+        for key, value in self.params._overrides.items():
+            if key not in Sweep.LOCAL_COMMANDS:
+                options[key] = value
+        options["para"] = ",".join(paths)
+        options["headless"] = True
+        options["lazy"] = True
+        return options
+
+
+
+    ############################################################
+
+    # Calls a function with the parameters for a combination within a worker
+    @staticmethod
+    def call (function, options, combination):
+        from .params import Params
+
+        # The commands of the main process are passed in the options instead
+        sys.argv = sys.argv[:1]
+        values = dict(options)
+        values.update(combination)
+        return function(Params(**values))
+
+
+
+    ############################################################
@@ -0,0 +1,176 @@
+import re
+
+# Class that checks and converts the values of a parameter
+# Each parameter is compiled into a validator once, when the file is read
+# The options column of the file may contain, as well as the allowed values:
+#   lo..hi      A range of numbers, where either end may be left out (0.., ..1.5)
+#   ~pattern    A regular expression that the whole value must match
+class Validator:
+
+    # The attributes are stored in slots, as there is a validator for each set of options
+    __slots__ = ("choices", "kind", "low", "high", "pattern")
+
+    # The shared validators for each type and set of options
+    SHARED = {}
+
+    # The pattern of a range of numbers
+    RANGE = re.compile(r"^\s*(-?[0-9.eE+-]*)\s*\.\.\s*(-?[0-9.eE+-]*)\s*$")
+
+    ############################################################
+
+    # Constructor for the validator
+    # Takes in the default value, which sets the type, and the list of option values
+    def __init__ (self, default, values = ()):
+        self.kind = type(default) if type(default) in (bool, int, float) else str
+        self.low = None
+        self.high = None
+        self.pattern = None
+
+        # Split the constraints from the allowed values
+        # Values that are not a valid range or pattern are allowed values, as they were before
+        choices = []
+        for value in values:
+            value = value.strip()
+            if value == "":
+                continue
+            elif value[0] == "~" and self.__pattern(value[1:]):
+                continue
+            elif self.__range(value):
+                continue
+            else:
+                choices.append(value)
+        self.choices = frozenset(choices)
+
+
+
+    ############################################################
+
+    # Reads a range of numbers into the low and high values
+    # Returns whether the value is a valid range
+    def __range (self, value) -> bool:
+        match = self.RANGE.match(value)
+        if match is None or (match.group(1) == "" and match.group(2) == ""):
+            return False
+        try:
+            low = Validator.number(match.group(1)) if match.group(1) != "" else None
+            high = Validator.number(match.group(2)) if match.group(2) != "" else None
+        except ValueError:
+            return False
+        self.low = low
+        self.high = high
+        return True
+
+
+
+    ############################################################
+
+    # Compiles a regular expression that the values must match
+    # Returns whether the pattern is a valid regular expression
+    def __pattern (self, value) -> bool:
+        try:
+            self.pattern = re.compile(value)
+        except re.error:
+            return False
+        return True
+
+
+
+    ############################################################
+
+    # Returns the shared validator for a default value and list of option values
+    @staticmethod
+    def compile (default, values = ()):
+        key = (type(default), tuple(values))
+        try:
+            return Validator.SHARED[key]
+        except KeyError:
+            return Validator.SHARED.setdefault(key, Validator(default, values))
+
+
+
+    ############################################################
+
+    # Returns whether a value is one of the allowed values
+    # Every value is allowed if there are no allowed values
+    def allowed (self, value) -> bool:
+        return len(self.choices) == 0 or value in self.choices or str(value) in self.choices
+
+
+
+    ############################################################
+
+    # Converts a string into a value of the type of the parameter
+    # Booleans are read for every type, as in the file
+    # Raises a ValueError if the string is not a valid value
+    def coerce (self, value: str):
+        if value.lower() in ("t", "f", "true", "false"):
+            return value.lower()[0] == "t"
+        if self.kind is int:
+            return int(value)
+        if self.kind is float:
+            return float(value)
+        if self.kind is bool:
+            raise ValueError("'%s' is not a boolean." % value)
+        return value
+
+
+
+    ############################################################
+
+    # Checks a value against the type, allowed values, range and pattern
+    # Returns the list of errors, which is empty if the value is valid
+    def check (self, value) -> list:
+        errors = []
+
+        # Check the type of the value, unless there are allowed values
+        number = type(value) in (int, float)
+        if len(self.choices) > 0:
+            pass
+        elif self.kind is bool and type(value) is not bool:
+            errors.append("%r is not a boolean" % (value,))
+        elif self.kind is int and type(value) is not int and type(value) is not bool:
+            errors.append("%r is not an integer" % (value,))
+        elif self.kind is float and not number and type(value) is not bool:
+            errors.append("%r is not a number" % (value,))
+
+        # Check the allowed values
+        if not self.allowed(value):
+            errors.append("%r is not one of %s" % (value, sorted(self.choices)))
+
+        # Check the range
+        if self.low is not None or self.high is not None:
+            if not number:
+                errors.append("%r is not a number within %s" % (value, self.range))
+            elif (self.low is not None and value < self.low) or (self.high is not None and value > self.high):
+                errors.append("%r is not within %s" % (value, self.range))
+
+        # Check the pattern
+        if self.pattern is not None and self.pattern.fullmatch(str(value)) is None:
+            errors.append("%r does not match '%s'" % (value, self.pattern.pattern))
+
+        return errors
+
+
+
+    ############################################################
+
+    # Returns the range as it is written in the file
+    @property
+    def range (self) -> str:
+        return "%s..%s" % ("" if self.low is None else self.low, "" if self.high is None else self.high)
+
+
+
+    ############################################################
+
+    # Reads a number from a range
+    @staticmethod
+    def number (value: str):
+        try:
+            return int(value)
+        except ValueError:
+            return float(value)
+
+
+
+    ############################################################
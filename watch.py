@@ -0,0 +1,187 @@
+import os
+import sys
+import select
+import threading
+
+# Class that watches parameter files and reloads them when they change
+# Linux inotify is used when it is available, otherwise the files are polled
+class Watcher:
+
+
+    ############################################################
+    # DEFINED CONSTANTS
+
+    # The inotify events for a file being closed after writing or moved into place
+    # Files are only reloaded once they are complete, rather than while being written
+    IN_CLOSE_WRITE  = 0x00000008
+    IN_MOVED_TO     = 0x00000080
+    IN_NONBLOCK     = 0x00000800
+
+
+
+    ############################################################
+
+    # Constructor for the watcher
+    # Takes in the reader (a ParamFile or ParamStack), an optional function that is
+    # called with the set of changed keys, the polling interval in seconds
+    # and whether to use inotify if it is available
+    def __init__ (self, reader, callback = None, interval = 1.0, inotify = True):
+        self.reader = reader
+        self.interval = float(interval)
+        self.inotify = inotify
+
+        # Tell the callback about the changed keys
+        if callback is not None:
+            reader.subscribe(callback)
+
+        # The thread and its stop event
+        self.thread = None
+        self.stopped = threading.Event()
+
+        # The last known state of each file
+        self.versions = dict([(path, self.__version(path)) for path in self.paths])
+
+
+
+    ############################################################
+
+    # Returns the paths of the files that are being watched
+    @property
+    def paths (self) -> list:
+        if hasattr(self.reader, "paths"):
+            return list(self.reader.paths)
+        return [self.reader.path]
+
+
+
+    ############################################################
+
+    # Starts watching the files in a background thread
+    def start (self):
+        if self.thread is not None:
+            return self
+
+        # The files are watched before the thread starts so no changes are missed
+        self.stopped.clear()
+        fd = self.__open() if self.inotify else None
+        self.thread = threading.Thread(target=self.__run, args=(fd,), name="params-watcher", daemon=True)
+        self.thread.start()
+        return self
+
+
+
+    ############################################################
+
+    # Stops watching the files
+    def stop (self):
+        self.stopped.set()
+        if self.thread is not None and self.thread is not threading.current_thread():
+            self.thread.join()
+        self.thread = None
+
+
+
+    ############################################################
+
+    # Checks the files for changes and reloads the reader if any have changed
+    # Returns the set of keys that have changed
+    def check (self) -> set:
+        changed = False
+        for path in self.paths:
+            version = self.__version(path)
+            if version != self.versions.get(path):
+                self.versions[path] = version
+                changed = True
+
+        # Files that are missing or partially written are tried again on the next check
+        if not changed:
+            return set()
+        try:
+            return self.reader.reload()
+        except Exception:
+            self.versions = {}
+            return set()
+
+
+
+    ############################################################
+
+    # Runs the watcher until it is stopped
+    # Takes in the inotify file descriptor, or None to poll the files
+    def __run (self, fd):
+        try:
+            while not self.stopped.is_set():
+
+                # Wait for a file event, or for the polling interval
+                if fd is not None:
+                    ready, _, _ = select.select([fd], [], [], self.interval)
+                    if ready:
+                        self.__drain(fd)
+                else:
+                    self.stopped.wait(self.interval)
+
+                if not self.stopped.is_set():
+                    self.check()
+        finally:
+            if fd is not None:
+                os.close(fd)
+
+
+
+    ############################################################
+
+    # Creates an inotify instance watching the directories of the files
+    # The directories are watched as the files are replaced when they are saved
+    # Returns the file descriptor or None if inotify is not available
+    def __open (self):
+        if not sys.platform.startswith("linux"):
+            return None
+
+        # Load the C library functions
+        try:
+            import ctypes
+            libc = ctypes.CDLL(None, use_errno=True)
+            fd = libc.inotify_init1(self.IN_NONBLOCK)
+        except (OSError, AttributeError):
+            return None
+        if fd < 0:
+            return None
+
+        # Watch each directory
+        mask = self.IN_CLOSE_WRITE | self.IN_MOVED_TO
+        for directory in set([os.path.dirname(os.path.abspath(p)) for p in self.paths]):
+            if libc.inotify_add_watch(fd, directory.encode(), mask) < 0:
+                os.close(fd)
+                return None
+
+        return fd
+
+
+
+    ############################################################
+
+    # Reads all of the waiting events from an inotify instance
+    # The events are not used, as the files are checked for changes directly
+    def __drain (self, fd):
+        while True:
+            try:
+                os.read(fd, 4096)
+            except (BlockingIOError, InterruptedError):
+                return
+
+
+
+    ############################################################
+
+    # Returns the size and modification time of a file
+    @staticmethod
+    def __version (path) -> tuple:
+        try:
+            stat = os.stat(path)
+            return (stat.st_size, stat.st_mtime_ns)
+        except OSError:
+            return None
+
+
+
+    ############################################################